@@ -0,0 +1,188 @@
+"""Display-ready images: an on-disk cache of processed assets and a texture atlas.
+
+Decoding and scaling images is the slow part of loading them. AssetCache
+keeps the processed pixels (already scaled or baked) as raw RGBA files named
+after the source file's modification time, so a later launch reads them
+back with no decoding or scaling; editing the source makes a new entry and
+the stale one is removed. Everything handed back is converted to the display
+format so blits need no per-pixel conversion.
+
+TextureAtlas packs many small sprites onto a few large surfaces and hands
+out subsurfaces for them, so they can be blitted like separate images.
+"""
+import json
+import os
+import zlib
+
+import pygame
+
+CACHE_DIR = ".kbc_cache"
+
+
+def to_display(surface, alpha=True):
+    """Convert a surface to the display format, if a display exists yet."""
+    if pygame.display.get_surface() is None:
+        return surface
+    return surface.convert_alpha() if alpha else surface.convert()
+
+
+class TextureAtlas:
+    """Shelf-packed sprite sheets with lookups by key.
+
+    Sprites are placed left to right on shelves as tall as the tallest sprite
+    in them; a new page is started when a page is full.
+    """
+    def __init__(self, page_size=(512, 512), padding=1):
+        self.page_size = page_size
+        self.padding = padding
+        self.pages = []
+        self.regions = {}
+        self.sprites = {}
+        # Pages drawn on by add() since the last take_changed()
+        self.changed = set()
+        self._shelf_y = self._shelf_x = self._shelf_height = 0
+
+    def __contains__(self, key):
+        return key in self.sprites
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def _new_page(self):
+        self.pages.append(to_display(pygame.Surface(self.page_size, pygame.SRCALPHA)))
+        self.pages[-1].fill((0, 0, 0, 0))
+        self._shelf_y = self._shelf_x = self._shelf_height = 0
+
+    def _place(self, width, height):
+        """Top-left corner and page index for a new sprite."""
+        page_width, page_height = self.page_size
+        if width > page_width or height > page_height:
+            raise ValueError(f"sprite of {width}x{height} does not fit a {page_width}x{page_height} atlas page")
+        if not self.pages:
+            self._new_page()
+        if self._shelf_x + width > page_width:
+            # Start the next shelf
+            self._shelf_y += self._shelf_height + self.padding
+            self._shelf_x = self._shelf_height = 0
+        if self._shelf_y + height > page_height:
+            self._new_page()
+        position = (self._shelf_x, self._shelf_y)
+        self._shelf_x += width + self.padding
+        self._shelf_height = max(self._shelf_height, height)
+        return len(self.pages) - 1, position
+
+    def add(self, key, surface):
+        """Copy a sprite into the atlas; returns its subsurface."""
+        page, position = self._place(*surface.get_size())
+        region = pygame.Rect(position, surface.get_size())
+        self.pages[page].blit(surface, region, special_flags=pygame.BLEND_RGBA_MAX)
+        self.changed.add(page)
+        self._store(key, page, region)
+        return self.sprites[key]
+
+    def take_changed(self):
+        """Pages that gained sprites since the last call, for re-uploading."""
+        pages = [self.pages[page] for page in sorted(self.changed)]
+        self.changed.clear()
+        return pages
+
+    def _store(self, key, page, region):
+        self.regions[key] = (page, region)
+        self.sprites[key] = self.pages[page].subsurface(region)
+
+    def get(self, key):
+        """The sprite stored under key, as a subsurface of its page."""
+        return self.sprites[key]
+
+    def region(self, key):
+        """(page index, rect) of the sprite stored under key."""
+        return self.regions[key]
+
+
+class AssetCache:
+    """Processed images on disk, keyed by source file and modification time."""
+    def __init__(self, directory=CACHE_DIR, enabled=True):
+        self.directory = directory
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, source, params):
+        stat = os.stat(source)
+        stem = os.path.basename(source).replace('.', '_')
+        variant = zlib.crc32(repr(params).encode('utf-8'))
+        return os.path.join(self.directory, f"{stem}-{variant:08x}-{stat.st_mtime_ns:x}-{stat.st_size:x}.rgba"), \
+            f"{stem}-{variant:08x}-"
+
+    def _read(self, path):
+        with open(path, 'rb') as f:
+            header = json.loads(f.readline())
+            data = f.read()
+        pages = []
+        width, height = header['size']
+        page_bytes = width * height * 4
+        for i in range(header['pages']):
+            pages.append(pygame.image.frombytes(data[i * page_bytes:(i + 1) * page_bytes], (width, height), 'RGBA'))
+        return header, pages
+
+    def _write(self, path, prefix, header, pages):
+        os.makedirs(self.directory, exist_ok=True)
+        # Drop entries for older versions of the same source
+        for name in os.listdir(self.directory):
+            if name.startswith(prefix):
+                os.remove(os.path.join(self.directory, name))
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(json.dumps(header).encode('utf-8') + b"\n")
+            for page in pages:
+                f.write(pygame.image.tobytes(page, 'RGBA'))
+        os.replace(tmp_path, path)
+
+    def image(self, source, params, build, alpha=True):
+        """A processed image of `source`, from disk or from build() on a miss.
+
+        params names the processing (e.g. the target size) so different
+        versions of one source are cached separately.
+        """
+        if self.enabled:
+            path, prefix = self._path(source, params)
+            try:
+                _, pages = self._read(path)
+                self.hits += 1
+                return to_display(pages[0], alpha)
+            except (OSError, ValueError, KeyError, pygame.error):
+                pass
+        self.misses += 1
+        surface = build()
+        if self.enabled and surface is not None:
+            try:
+                self._write(path, prefix, {'size': list(surface.get_size()), 'pages': 1}, [surface])
+            except OSError as e:
+                print(f"Could not write asset cache {path}: {e}")
+        return None if surface is None else to_display(surface, alpha)
+
+    def atlas(self, source, params, build, page_size=(512, 512)):
+        """A TextureAtlas for `source`, from disk or filled by build(atlas) on a miss."""
+        atlas = TextureAtlas(page_size)
+        if self.enabled:
+            path, prefix = self._path(source, params)
+            try:
+                header, pages = self._read(path)
+                for page in pages:
+                    atlas.pages.append(to_display(page))
+                for key, page, region in header['regions']:
+                    atlas._store(key, page, pygame.Rect(region))
+                self.hits += 1
+                return atlas
+            except (OSError, ValueError, KeyError, IndexError, pygame.error):
+                atlas = TextureAtlas(page_size)
+        self.misses += 1
+        build(atlas)
+        if self.enabled:
+            header = {'size': list(page_size), 'pages': len(atlas.pages),
+                      'regions': [[key, page, list(region)] for key, (page, region) in atlas.regions.items()]}
+            try:
+                self._write(path, prefix, header, atlas.pages)
+            except OSError as e:
+                print(f"Could not write asset cache {path}: {e}")
+        return atlas
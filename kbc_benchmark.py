@@ -0,0 +1,312 @@
+"""Headless benchmark suite for rendering, layout and question loading.
+
+Runs with SDL's dummy video and audio drivers, so no display or sound card
+is needed. Results are written as JSON; pass a previous results file as the
+baseline to flag regressions beyond a threshold (the exit status is 1 if any
+benchmark got slower than that).
+
+Examples:
+    python kbc_benchmark.py --output bench.json
+    python kbc_benchmark.py --baseline bench.json --threshold 0.10
+    python kbc_benchmark.py --quick --only button
+"""
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+
+import pygame
+
+import kbc_pygame_game as kbc
+from kbc_capture import READ, WRITTEN, FrameCapture
+from question_pack import compile_pack
+
+SHORT_QUESTION = "What is the capital of France?"
+LONG_QUESTION = " ".join(["Which of these famous landmarks, built over several decades by",
+                          "thousands of workers and completed long after its original architect",
+                          "had died, is located in a city that also hosts one of the largest",
+                          "annual film festivals and has a river flowing through its centre?"] * 2)
+
+QUESTION_BANK_SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+
+
+def measure(fn, min_time=0.2, repeats=5):
+    """Median ms per call of fn over several timed batches."""
+    # Calibrate a batch size that runs for roughly min_time / repeats
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / repeats or number >= 1 << 20:
+            break
+        number *= 2
+
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) * 1000 / number)
+    samples.sort()
+    return {'ms_per_op': samples[len(samples) // 2], 'best_ms': samples[0], 'calls': number * repeats}
+
+
+def measure_once(fn):
+    """ms for a single call, for benchmarks too slow to repeat."""
+    start = time.perf_counter()
+    fn()
+    return {'ms_per_op': (time.perf_counter() - start) * 1000, 'best_ms': None, 'calls': 1}
+
+
+def bench_buttons(game, surface):
+    results = {}
+    button = kbc.Button(100, 350, 250, 70, "A. Paris", kbc.LIGHT_BLUE, (100, 150, 255))
+    for hovered in (False, True):
+        button.is_hovered = hovered
+        results[f"button_draw_{'hovered' if hovered else 'normal'}"] = measure(lambda: button.draw(surface))
+
+    # Text changes every call, so each draw rebuilds the sprite
+    texts = [f"B. Option {i}" for i in range(64)]
+    counter = iter(range(1 << 62))
+
+    def draw_changing():
+        button.text = texts[next(counter) % len(texts)]
+        button.draw(surface)
+    kbc.TEXT_CACHE.clear()
+    results['button_draw_text_change'] = measure(draw_changing)
+    return results
+
+
+def bench_text(game, surface):
+    results = {}
+    for name, text in (('short', SHORT_QUESTION), ('long', LONG_QUESTION)):
+        results[f"draw_text_wrapped_{name}"] = measure(
+            lambda: game.draw_text_wrapped(text, kbc.MEDIUM_FONT, kbc.WHITE, kbc.SCREEN_WIDTH // 2,
+                                           150, kbc.SCREEN_WIDTH - 100, surface))
+    return results
+
+
+def bench_confetti(game, surface):
+    results = {}
+    for count in (100, 1000, 10000):
+        game.win_particles.clear()
+        game.confetti_count = count
+
+        def frame():
+            # Keep the population steady as particles fall off the bottom
+            if len(game.win_particles) < count // 2:
+                game.win_particles.clear()
+                game.create_win_animation()
+            # One simulation step per frame, as at 60 FPS
+            game.win_particles.step()
+            game.draw_win_animation(surface)
+        game.create_win_animation()
+        results[f"update_win_animation_{count}"] = measure(frame)
+    game.confetti_count = kbc.CONFETTI_COUNT
+    game.win_particles.clear()
+    return results
+
+
+def bench_logo(game, surface):
+    results = {}
+    game.screen, screen = surface, game.screen
+
+    def intro_frame():
+        if game.logo_animation_done:
+            game.reset_logo_animation()
+        game.animate_logo()
+    game.bake_logo_intro()
+    game.reset_logo_animation()
+    results['animate_logo_baked'] = measure(intro_frame)
+    results['animate_logo_live'] = {'ms_per_op': game.measure_logo_intro(baked=False)['ms_per_frame'],
+                                    'best_ms': None, 'calls': 1}
+    game.screen = screen
+    return results
+
+
+def bench_backends(game, surface):
+    """Whole frames, presented, on each renderer backend."""
+    results = {}
+    for backend in ("surface", "texture"):
+        game = kbc.KBCGame(dirty_rects=False, profile=False, renderer=backend, capture=None, stats=None)
+
+        def menu_frame():
+            if game.logo_animation_done:
+                game.reset_logo_animation()
+            game.update_logo_animation()
+            game.draw_main_menu()
+            game.present_frame()
+        game.reset_logo_animation()
+        results[f"{backend}_menu_intro_frame"] = measure(menu_frame)
+
+        game.start_game()
+        game.option_buttons[1].is_hovered = True
+
+        def game_frame():
+            game.draw_game_screen()
+            game.present_frame()
+        results[f"{backend}_game_frame"] = measure(game_frame)
+
+        game.current_state = kbc.RESULT_SCREEN
+        game.game_won = True
+        for count in (100, 1000):
+            game.confetti_count = count
+
+            def win_frame():
+                if len(game.win_particles) < count // 2:
+                    game.win_particles.clear()
+                    game.create_win_animation()
+                game.win_particles.step()
+                game.draw_result_screen()
+                game.present_frame()
+            game.win_particles.clear()
+            game.create_win_animation()
+            results[f"{backend}_win_frame_{count}"] = measure(win_frame)
+    return results
+
+
+def bench_capture(game, surface):
+    """Cost of handing a frame to the capture ring, against copying it out."""
+    results = {}
+    capture = FrameCapture(f"kbc_bench_{os.getpid()}")
+    frame = game.screen
+    try:
+        def write():
+            capture.write(frame, 0)
+            # Stand-in for a reader that keeps up
+            capture.ring.counters[READ] = capture.ring.counters[WRITTEN]
+        results['capture_frame'] = measure(write)
+
+        # Nobody reading: every frame is dropped
+        capture.ring.counters[READ] = 0
+        capture.ring.counters[WRITTEN] = capture.ring.slots
+        results['capture_frame_dropped'] = measure(lambda: capture.write(frame, 0))
+    finally:
+        capture.close()
+    results['copy_frame_tobytes'] = measure(lambda: pygame.image.tobytes(frame, 'RGBX'))
+    return results
+
+
+def write_bank(path, size):
+    rng = random.Random(size)
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(size):
+            f.write(f"Synthetic question number {i} about topic {rng.randrange(1000)}?"
+                    f"|Answer {i}|Option B {i}|Option C {i}|Option D {i}|{'ABCD'[i % 4]}"
+                    f"|{rng.randint(1, 15)}\n")
+
+
+def bench_questions(game, sizes):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            text_path = os.path.join(tmp, f"bank_{size}.txt")
+            pack_path = os.path.join(tmp, f"bank_{size}.kbcq")
+            write_bank(text_path, size)
+
+            missing_pack = os.path.join(tmp, "missing.kbcq")
+            results[f"load_questions_text_{size}"] = measure_once(
+                lambda: game.load_questions(text_path, missing_pack))
+            results[f"compile_pack_{size}"] = measure_once(lambda: compile_pack(text_path, pack_path))
+            results[f"load_questions_pack_{size}"] = measure_once(
+                lambda: game.load_questions(text_path, pack_path))
+            # The sampler reads the pack's mapping; drop it before unmapping
+            pack = game.questions
+            game.questions = game.question_tiers = game.question_sampler = None
+            pack.close()
+    game.load_questions()
+    return results
+
+
+BENCHMARKS = {
+    'button': bench_buttons,
+    'text': bench_text,
+    'confetti': bench_confetti,
+    'logo': bench_logo,
+    'backends': bench_backends,
+    'capture': bench_capture,
+}
+
+
+def run(only=None, sizes=QUESTION_BANK_SIZES):
+    game = kbc.KBCGame(dirty_rects=False, profile=False, capture=None, stats=None)
+    surface = pygame.Surface((kbc.SCREEN_WIDTH, kbc.SCREEN_HEIGHT))
+    results = {}
+    for name, bench in BENCHMARKS.items():
+        if only and name not in only:
+            continue
+        print(f"Running {name} benchmarks...", file=sys.stderr)
+        results.update(bench(game, surface))
+    if not only or 'questions' in only:
+        print("Running questions benchmarks...", file=sys.stderr)
+        results.update(bench_questions(game, sizes))
+    return {
+        'meta': {
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'platform': platform.platform()
+        },
+        'results': results
+    }
+
+
+def compare(report, baseline, threshold):
+    """Print results against a baseline; returns the names that regressed."""
+    regressions = []
+    print(f"{'benchmark':<36}{'ms/op':>12}{'baseline':>12}{'change':>10}")
+    for name, result in report['results'].items():
+        current = result['ms_per_op']
+        base = baseline.get('results', {}).get(name, {}).get('ms_per_op')
+        if base:
+            change = current / base - 1
+            flag = "  REGRESSION" if change > threshold else ""
+            if flag:
+                regressions.append(name)
+            print(f"{name:<36}{current:>12.4f}{base:>12.4f}{change:>+9.1%}{flag}")
+        else:
+            print(f"{name:<36}{current:>12.4f}{'-':>12}{'-':>10}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless KBC benchmark suite.")
+    parser.add_argument("--output", default="benchmark_results.json", help="where to write results")
+    parser.add_argument("--baseline", help="previous results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="fractional slowdown that counts as a regression (default 0.10)")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS) + ['questions'],
+                        help="run only these benchmark groups")
+    parser.add_argument("--quick", action="store_true", help="stop question banks at 10^5 lines")
+    args = parser.parse_args()
+
+    sizes = [s for s in QUESTION_BANK_SIZES if not args.quick or s <= 10 ** 5]
+    report = run(args.only, sizes)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    regressions = compare(report, baseline, args.threshold)
+    print(f"Results written to {args.output}")
+
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}: "
+              f"{', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
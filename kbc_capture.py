@@ -0,0 +1,288 @@
+"""Frame capture into a shared-memory ring buffer, for broadcast and recording.
+
+With KBC_CAPTURE=<name> the game hands every presented frame to a ring of
+fixed-size slots in a shared memory block of that name. Frames are read
+straight out of the surface's pixel buffer through a buffer view and copied
+once, into the slot; nothing else is allocated per frame. An encoder or
+streamer in another process attaches to the block by name and reads frames
+in order.
+
+The ring has one writer and one reader. The writer never waits: when every
+slot still holds a frame the reader has not taken, the new frame is dropped
+and counted, so a slow consumer costs frames, not game frame rate.
+
+Block layout (little-endian):
+    0    header: magic, version, width, height, slots, pixel format
+    64   counters (uint64): frames written, frames read, dropped, closed
+    96   per-slot timestamps (uint64 ms off the game clock)
+    ...  slots of height x width 32-bit pixels, 64-byte aligned
+
+The pixel format is named as ffmpeg does (e.g. bgr0), so a raw dump can be
+encoded with the command `dump` prints. Counters are plain aligned 64-bit
+stores, which the reader sees in order on x86 and ARM64 with one writer.
+
+Examples:
+    KBC_CAPTURE=kbc_frames python kbc_pygame_game.py
+    python kbc_capture.py dump kbc_frames frames.raw --seconds 30
+    python kbc_capture.py dump kbc_frames frames.raw --lag-ms 50   # see drops
+"""
+import argparse
+import json
+import struct
+import sys
+import time
+from collections import deque
+from multiprocessing import shared_memory
+
+import numpy as np
+
+MAGIC = b"KBCF"
+VERSION = 1
+HEADER = struct.Struct("<4sIIIII8s")
+COUNTERS_OFFSET = 64
+STAMPS_OFFSET = 96
+
+# Slots in the ring: how far the reader may fall behind before frames drop
+CAPTURE_SLOTS = 8
+
+# Capture timings kept for the percentiles in the exit report
+TIMING_WINDOW = 10000
+
+WRITTEN, READ, DROPPED, CLOSED = range(4)
+
+
+def pixel_format(surface):
+    """ffmpeg name for a 32-bit surface's byte order, e.g. bgr0 or rgba."""
+    names = {}
+    for channel, mask, shift in zip("rgba", surface.get_masks(), surface.get_shifts()):
+        if mask:
+            names[shift // 8] = channel
+    return "".join(names.get(byte, "0") for byte in range(4))
+
+
+def _frames_offset(slots):
+    return (STAMPS_OFFSET + 8 * slots + 63) // 64 * 64
+
+
+class FrameRing:
+    """A ring of frame slots in a named shared memory block."""
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        magic, version, self.width, self.height, self.slots, _, pix_fmt = HEADER.unpack_from(shm.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"shared memory {shm.name!r} is not a version {VERSION} frame ring")
+        self.pix_fmt = pix_fmt.rstrip(b"\0").decode("ascii")
+        self.counters = np.ndarray(4, np.uint64, shm.buf, COUNTERS_OFFSET)
+        self.stamps = np.ndarray(self.slots, np.uint64, shm.buf, STAMPS_OFFSET)
+        self.frames = np.ndarray((self.slots, self.height, self.width), np.uint32, shm.buf,
+                                 _frames_offset(self.slots))
+
+    @classmethod
+    def create(cls, name, width, height, pix_fmt, slots=CAPTURE_SLOTS):
+        size = _frames_offset(slots) + slots * width * height * 4
+        try:
+            shm = shared_memory.SharedMemory(name, create=True, size=size)
+        except FileExistsError:
+            # Left behind by a game that did not exit cleanly
+            stale = shared_memory.SharedMemory(name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name, create=True, size=size)
+        shm.buf[:_frames_offset(slots)] = bytes(_frames_offset(slots))
+        HEADER.pack_into(shm.buf, 0, MAGIC, VERSION, width, height, slots, 0, pix_fmt.encode("ascii"))
+        ring = cls(shm, owner=True)
+        # Touch every page now rather than page-faulting inside the first frames
+        ring.frames.fill(0)
+        return ring
+
+    @classmethod
+    def attach(cls, name):
+        shm = shared_memory.SharedMemory(name)
+        try:
+            # Only the writer may unlink the block; keep Python's resource
+            # tracker from removing it when this process exits
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except (ImportError, AttributeError, KeyError):
+            pass
+        return cls(shm, owner=False)
+
+    def pending(self):
+        """Frames written but not yet read."""
+        return int(self.counters[WRITTEN] - self.counters[READ])
+
+    def closed(self):
+        return bool(self.counters[CLOSED])
+
+    def close(self):
+        # Views into the block must go before it can be unmapped
+        del self.counters, self.stamps, self.frames
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class FrameCapture:
+    """Writer side: copies presented frames into the ring, dropping when it is full."""
+    def __init__(self, name, slots=CAPTURE_SLOTS):
+        self.name = name
+        self.slots = slots
+        self.ring = None
+        self.captured = 0
+        self.dropped = 0
+        self.times = deque(maxlen=TIMING_WINDOW)
+        self.total_time = 0.0
+
+    def _open(self, surface):
+        if surface.get_bitsize() != 32:
+            raise ValueError(f"frame capture needs a 32-bit surface, got {surface.get_bitsize()}-bit")
+        width, height = surface.get_size()
+        self.ring = FrameRing.create(self.name, width, height, pixel_format(surface), self.slots)
+
+    def write(self, surface, ticks):
+        """Copy one frame into the next free slot; False if it was dropped."""
+        if self.ring is None:
+            self._open(surface)
+        start = time.perf_counter()
+        ring = self.ring
+        counters = ring.counters
+        written = int(counters[WRITTEN])
+        if written - int(counters[READ]) >= ring.slots:
+            self.dropped += 1
+            counters[DROPPED] = self.dropped
+            self._time(start)
+            return False
+
+        slot = written % ring.slots
+        # A view of the surface's own pixels, rows pitch bytes apart; the
+        # surface stays locked only while the view is alive
+        pixels = np.frombuffer(surface.get_view('1'), np.uint32)
+        pixels = pixels.reshape(ring.height, surface.get_pitch() // 4)[:, :ring.width]
+        np.copyto(ring.frames[slot], pixels)
+        del pixels
+        ring.stamps[slot] = ticks
+        counters[WRITTEN] = written + 1
+        self.captured += 1
+        self._time(start)
+        return True
+
+    def _time(self, start):
+        elapsed = time.perf_counter() - start
+        self.times.append(elapsed)
+        self.total_time += elapsed
+
+    def stats(self):
+        times = sorted(self.times)
+        frames = self.captured + self.dropped
+        return {
+            'captured': self.captured,
+            'dropped': self.dropped,
+            'mean_ms': 1000 * self.total_time / frames if frames else 0.0,
+            'p99_ms': 1000 * times[min(len(times) - 1, int(len(times) * 0.99))] if times else 0.0,
+            'max_ms': 1000 * times[-1] if times else 0.0
+        }
+
+    def close(self):
+        if self.ring is not None:
+            self.ring.counters[CLOSED] = 1
+            self.ring.close()
+            self.ring = None
+
+
+class FrameReader:
+    """Reader side: takes frames from the ring in order, without copying them."""
+    def __init__(self, name, wait_seconds=0.0):
+        deadline = time.monotonic() + wait_seconds
+        while True:
+            try:
+                self.ring = FrameRing.attach(name)
+                break
+            except FileNotFoundError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.05)
+
+    def next_frame(self):
+        """(ticks, pixels) of the oldest unread frame, or None if there is none yet.
+
+        pixels is a view into the ring; call release() once done with it so
+        the slot can be reused.
+        """
+        ring = self.ring
+        read = int(ring.counters[READ])
+        if int(ring.counters[WRITTEN]) == read:
+            return None
+        slot = read % ring.slots
+        return int(ring.stamps[slot]), ring.frames[slot]
+
+    def release(self):
+        self.ring.counters[READ] += 1
+
+    def close(self):
+        self.ring.close()
+
+
+def dump(name, path, max_frames=None, seconds=None, lag_ms=0.0, wait_seconds=10.0):
+    """Write frames from a ring to a raw video file until the game exits or a limit is hit."""
+    reader = FrameReader(name, wait_seconds)
+    ring = reader.ring
+    stamps = []
+    started = time.monotonic()
+    pixels = None
+    with open(path, "wb") as out:
+        while max_frames is None or len(stamps) < max_frames:
+            if seconds is not None and time.monotonic() - started >= seconds:
+                break
+            frame = reader.next_frame()
+            if frame is None:
+                if ring.closed():
+                    break
+                time.sleep(0.002)
+                continue
+            ticks, pixels = frame
+            frame = None
+            out.write(memoryview(pixels))
+            pixels = None
+            reader.release()
+            stamps.append(ticks)
+            if lag_ms:
+                # Pretend to be a slow encoder
+                time.sleep(lag_ms / 1000)
+    dropped = int(ring.counters[DROPPED])
+    info = {'width': ring.width, 'height': ring.height, 'pix_fmt': ring.pix_fmt,
+            'frames': len(stamps), 'dropped': dropped, 'timestamps_ms': stamps}
+    reader.close()
+    with open(path + ".json", "w") as f:
+        json.dump(info, f)
+    return info
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read frames captured with KBC_CAPTURE.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    dump_parser = sub.add_parser("dump", help="write captured frames to a raw video file")
+    dump_parser.add_argument("name", help="shared memory name given in KBC_CAPTURE")
+    dump_parser.add_argument("path", help="raw video file to write; timestamps go to <path>.json")
+    dump_parser.add_argument("--frames", type=int, default=None, help="stop after this many frames")
+    dump_parser.add_argument("--seconds", type=float, default=None, help="stop after this long")
+    dump_parser.add_argument("--lag-ms", type=float, default=0.0, help="sleep this long after each frame")
+    dump_parser.add_argument("--wait", type=float, default=10.0, help="seconds to wait for the game to start")
+    args = parser.parse_args()
+
+    try:
+        info = dump(args.name, args.path, args.frames, args.seconds, args.lag_ms, args.wait)
+    except FileNotFoundError:
+        print(f"Error: no frame ring named {args.name!r}; start the game with KBC_CAPTURE={args.name}")
+        sys.exit(1)
+    stamps = info['timestamps_ms']
+    span = (stamps[-1] - stamps[0]) / 1000 if len(stamps) > 1 else 0.0
+    fps = (len(stamps) - 1) / span if span else 60
+    print(f"Wrote {info['frames']} frames ({info['width']}x{info['height']} {info['pix_fmt']}, "
+          f"{span:.1f}s of play) to {args.path}; the game dropped {info['dropped']}")
+    print(f"Encode with: ffmpeg -f rawvideo -pixel_format {info['pix_fmt']} "
+          f"-video_size {info['width']}x{info['height']} -framerate {fps:.2f} -i {args.path} out.mp4")
+
+
+if __name__ == "__main__":
+    main()
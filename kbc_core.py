@@ -0,0 +1,100 @@
+"""Game rules for the KBC quiz, free of any pygame dependency.
+
+GameCore holds the prize ladder, the question timer and the state machine
+that KBCGame drives from its frame loop. Time is passed in as milliseconds
+from any monotonic clock, so the same rules can run headless, e.g. in the
+payout simulator, without a display, mixer or pygame clock.
+"""
+from kbc_timing import Deadline
+
+# Game states
+MAIN_MENU = 0
+GAME_SCREEN = 1
+RESULT_SCREEN = 2
+STATE_NAMES = {MAIN_MENU: "menu", GAME_SCREEN: "game", RESULT_SCREEN: "result"}
+
+# Prize for each correctly answered question, in rupees
+PRIZE_MONEY = [1000, 2000, 3000, 5000, 10000, 20000, 40000, 80000,
+               160000, 320000, 640000, 1250000, 2500000, 5000000, 10000000]
+QUESTIONS_PER_GAME = len(PRIZE_MONEY)
+
+# Seconds allowed per question
+QUESTION_TIME = 30
+
+# Outcomes reported by check_answer and update_timer
+CORRECT = "correct"
+WRONG = "wrong"
+WON = "won"
+TIMEOUT = "timeout"
+
+
+class GameCore:
+    """State machine for one player's game."""
+    def __init__(self, prize_money=PRIZE_MONEY, question_time=QUESTION_TIME):
+        self.prize_money = list(prize_money)
+        self.question_time = question_time
+        self.current_state = MAIN_MENU
+        self.current_question = 0
+        self.selected_questions = []
+        self.won_amount = 0
+        self.game_won = False
+        self.time_left = question_time
+        self.last_time_update = 0
+        self.timer = Deadline(question_time * 1000, 0)
+
+    def start(self, questions, now):
+        """Start a new game with one question per prize rung."""
+        self.current_question = 0
+        self.won_amount = 0
+        self.game_won = False
+        self.time_left = self.question_time
+        self.last_time_update = now
+        self.timer.start(now)
+        self.selected_questions = list(questions)
+        self.current_state = GAME_SCREEN
+
+    def check_answer(self, selected_option, now):
+        """Apply an answer; returns CORRECT, WON or WRONG."""
+        correct_option = self.selected_questions[self.current_question]['correct']
+
+        if selected_option != correct_option:
+            # Game over, keeping the prize for the last correct answer
+            self.current_state = RESULT_SCREEN
+            return WRONG
+
+        self.won_amount = self.prize_money[self.current_question]
+        self.current_question += 1
+
+        if self.current_question >= len(self.prize_money):
+            self.game_won = True
+            self.current_state = RESULT_SCREEN
+            return WON
+
+        # Reset timer for next question
+        self.time_left = self.question_time
+        self.last_time_update = now
+        self.timer.start(now)
+        return CORRECT
+
+    def expire(self):
+        """End the game because the question timer ran out; returns TIMEOUT.
+
+        For hosts that track the deadline themselves instead of calling
+        update_timer every frame.
+        """
+        self.time_left = 0
+        self.current_state = RESULT_SCREEN
+        return TIMEOUT
+
+    def update_timer(self, now):
+        """Count the timer down; returns TIMEOUT when it runs out, else None.
+
+        time_left is worked out from the question's deadline, so it does not
+        matter how often or how late this is called.
+        """
+        self.time_left = self.timer.seconds_left(now)
+        self.last_time_update = now
+        if self.timer.expired(now):
+            self.current_state = RESULT_SCREEN
+            return TIMEOUT
+        return None
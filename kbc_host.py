@@ -0,0 +1,368 @@
+"""Host many game sessions in one process and tile them into one picture.
+
+Built for the spectator wall: every session is a full KBCGame drawing to an
+offscreen surface, played by a synthetic player (the payout simulator's
+PlayerModel) clicking its buttons. Fonts, images, sounds, questions and baked
+sprites live in one SharedAssets instance that all sessions read from, so an
+extra session costs little more than its own frame buffer and game state.
+
+Sessions are stepped by a deficit round-robin scheduler. Each host frame has
+a time budget split evenly between sessions; a session that overruns its
+share pays the time back by sitting out its next turns, and sessions not
+reached before the budget ran out go first on the next frame. A busy
+session therefore only slows itself down: the timer, logo and confetti run
+off the clock, so a session that is stepped less often just shows fewer
+frames.
+
+Examples:
+    python kbc_host.py --sessions 16 --columns 4 --seconds 20
+    python kbc_host.py --sessions 9 --window
+    python kbc_host.py --sessions 64 --fast --output wall.png
+"""
+import argparse
+import math
+import os
+import subprocess
+import sys
+import time
+from collections import deque
+
+import numpy as np
+
+from kbc_simulator import OPTION_LETTERS, PlayerModel
+
+# Pause on the menu and result screens before the player clicks on
+MENU_PAUSE_MS = 1500
+RESULT_PAUSE_MS = 4000
+
+
+def rss_bytes():
+    """Resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+        # ru_maxrss is the peak, in kilobytes on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class AutoPlayer:
+    """Plays a session by moving its mouse and clicking its buttons."""
+    def __init__(self, game, player, rng):
+        self.game = game
+        self.player = player
+        self.rng = rng
+        self.mouse = (0, 0)
+        self.screen_since = None
+        self.state = None
+        self.question = None
+        self.answer_at = None
+        self.choice = 0
+        game.read_mouse = lambda: self.mouse
+
+    def _click(self, button):
+        import pygame
+        self.mouse = button.rect.center
+        return [pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=self.mouse)]
+
+    def events(self, now):
+        """Input for the session's next frame at time `now` (ms)."""
+        import kbc_pygame_game as kbc
+
+        game = self.game
+        if game.current_state != self.state:
+            self.state = game.current_state
+            self.screen_since = now
+
+        if game.current_state == kbc.MAIN_MENU:
+            if game.logo_animation_done and now - self.screen_since >= MENU_PAUSE_MS:
+                return self._click(game.start_button)
+            return []
+
+        if game.current_state == kbc.RESULT_SCREEN:
+            if now - self.screen_since >= RESULT_PAUSE_MS:
+                return self._click(game.play_again_button)
+            return []
+
+        # A new question: decide how long to think about it
+        question = (game.core.timer.started, game.current_question)
+        if question != self.question:
+            self.question = question
+            response_ms = 1000 * self.player.response_median * math.exp(
+                self.player.response_sigma * self.rng.standard_normal())
+            self.answer_at = game.core.timer.started + response_ms
+            self.choice = 0 if self.rng.random() < self.player.answer_chance(game.current_question) else 1
+        if now < self.answer_at:
+            return []
+        self.answer_at = math.inf
+        correct = OPTION_LETTERS.index(game.selected_questions[game.current_question]['correct'])
+        option = correct if self.choice == 0 else (correct + 1 + int(self.rng.integers(3))) % 4
+        return self._click(game.option_buttons[option])
+
+
+class Session:
+    """One hosted game, its player and its scheduling bookkeeping."""
+    def __init__(self, index, game, player):
+        self.index = index
+        self.game = game
+        self.player = player
+        self.credit = 0.0
+        self.steps = 0
+        self.step_ms = 0.0
+        self.last_step = None
+        self.max_gap_ms = 0
+        self.drawn = False
+
+
+class SessionHost:
+    """Steps sessions fairly within a frame budget and tiles their frames."""
+    def __init__(self, count, columns=None, tile_size=(400, 300), fps=60, budget_ms=None, seed=0,
+                 player=None, fast=False, window=False, smooth=False):
+        import pygame
+        import kbc_pygame_game as kbc
+
+        self.kbc = kbc
+        self.columns = columns or math.ceil(math.sqrt(count))
+        self.rows = math.ceil(count / self.columns)
+        self.tile_size = tile_size
+        self.fps = fps
+        self.budget_ms = budget_ms if budget_ms is not None else 1000 / fps
+        self.fast = fast
+        self.smooth = smooth
+        self.player = player or PlayerModel(response_median=3.0)
+        self.rng = np.random.default_rng(seed)
+        self.sessions = []
+        self.queue = deque()
+        self.ticks = 0
+        self.clock_ms = 0
+        self.started = None
+        self.window = window
+        self.memory = {}
+
+        # Open the display first, hidden unless shown, so every asset and
+        # session frame is converted to its pixel format for fast blits
+        self.wall = pygame.display.set_mode(self.wall_size(), 0 if window else pygame.HIDDEN)
+        pygame.display.set_caption(f"KBC spectator wall - {count} sessions")
+
+        # Every session reads the same fonts, images, questions and sprites
+        self.assets = kbc.SharedAssets(audio=False)
+        self.assets.load_all()
+        # Room in the text cache for every session's labels
+        kbc.TEXT_CACHE.max_size = max(kbc.TEXT_CACHE.max_size, 64 * count)
+
+        self.memory['before_sessions'] = rss_bytes()
+        for i in range(count):
+            self.add_session()
+            if i == 0:
+                # The first session also pays for any shared sprites it bakes
+                self.warm_up(self.sessions[0])
+                self.memory['one_session'] = rss_bytes()
+        for session in self.sessions[1:]:
+            self.warm_up(session)
+        self.memory['all_sessions'] = rss_bytes()
+
+    def now(self):
+        """Host clock in ms: real time, or one frame per tick with --fast."""
+        if self.fast:
+            return self.clock_ms
+        return int((time.perf_counter() - self.started) * 1000) if self.started else 0
+
+    def add_session(self):
+        kbc = self.kbc
+        game = kbc.KBCGame(dirty_rects=False, frame_caps={}, profile=False, renderer="offscreen",
+                           assets=self.assets, capture=None, stats=None)
+        game.ticks = self.now
+        game.confetti_rng = np.random.default_rng(self.rng.integers(1 << 63))
+        game.reset_logo_animation()
+        session = Session(len(self.sessions), game,
+                          AutoPlayer(game, self.player, np.random.default_rng(self.rng.integers(1 << 63))))
+        self.sessions.append(session)
+        self.queue.append(session)
+        return session
+
+    def warm_up(self, session):
+        """Draw every screen once so lazily baked sprites exist before memory is measured."""
+        game = session.game
+        game.draw_main_menu()
+        game.start_game()
+        game.draw_game_screen()
+        game.core.expire()
+        game.draw_result_screen()
+        game.current_state = self.kbc.MAIN_MENU
+        game.reset_logo_animation()
+
+    def step_session(self, session, now):
+        start = time.perf_counter()
+        session.game.step(session.player.events(now))
+        elapsed = (time.perf_counter() - start) * 1000
+        session.steps += 1
+        session.step_ms += elapsed
+        if session.last_step is not None:
+            session.max_gap_ms = max(session.max_gap_ms, now - session.last_step)
+        session.last_step = now
+        session.drawn = True
+        return elapsed
+
+    def schedule(self, now):
+        """Step sessions in turn until every one had a turn or the budget is spent.
+
+        Each turn adds an even share of the budget to a session's credit and
+        steps it only while the credit is positive, charging what the step
+        cost. Sessions left over when the budget runs out stay at the front
+        of the queue for the next frame.
+        """
+        quantum = self.budget_ms / len(self.queue)
+        spent = 0.0
+        for _ in range(len(self.queue)):
+            if spent >= self.budget_ms:
+                break
+            session = self.queue.popleft()
+            self.queue.append(session)
+            session.credit = min(session.credit + quantum, quantum)
+            if session.credit <= 0:
+                continue
+            cost = self.step_session(session, now)
+            session.credit -= cost
+            spent += cost
+        return spent
+
+    def compose(self, target):
+        """Scale the frames of sessions stepped since the last call into their tiles."""
+        import pygame
+
+        width, height = self.tile_size
+        for session in self.sessions:
+            if not session.drawn:
+                continue
+            session.drawn = False
+            row, column = divmod(session.index, self.columns)
+            tile = target.subsurface((column * width, row * height, width, height))
+            frame = session.game.screen
+            if frame.get_size() == self.tile_size:
+                tile.blit(frame, (0, 0))
+            elif self.smooth:
+                pygame.transform.smoothscale(frame, self.tile_size, tile)
+            else:
+                # Nearest-neighbour: about a tenth of the cost of smoothscale
+                pygame.transform.scale(frame, self.tile_size, tile)
+
+    def wall_size(self):
+        return self.columns * self.tile_size[0], self.rows * self.tile_size[1]
+
+    def run(self, seconds):
+        """Run for `seconds` of host time."""
+        import pygame
+
+        window = self.window
+        self.started = time.perf_counter()
+        clock = pygame.time.Clock()
+        self.busy_ms = 0.0
+        self.compose_ms = 0.0
+        while self.now() < seconds * 1000:
+            if window:
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        return
+            self.busy_ms += self.schedule(self.now())
+            start = time.perf_counter()
+            self.compose(self.wall)
+            self.compose_ms += (time.perf_counter() - start) * 1000
+            self.ticks += 1
+            if self.fast:
+                self.clock_ms += 1000 / self.fps
+            elif window:
+                pygame.display.flip()
+                clock.tick(self.fps)
+            else:
+                clock.tick(self.fps)
+        self.elapsed = time.perf_counter() - self.started
+
+    def report(self, standalone=None):
+        """Lines summarising throughput, fairness and memory."""
+        count = len(self.sessions)
+        seconds = self.now() / 1000
+        rates = sorted(session.steps / seconds for session in self.sessions) if seconds else [0.0]
+        gaps = [session.max_gap_ms for session in self.sessions]
+        lines = [f"{count} sessions, {self.ticks} host frames in {self.elapsed:.1f}s "
+                 f"({self.ticks / self.elapsed:.1f} frames/s wall clock, {seconds:.1f}s of game time)",
+                 f"Session steps per game second: min {rates[0]:.1f}  median {rates[len(rates) // 2]:.1f}  "
+                 f"max {rates[-1]:.1f}",
+                 f"Longest wait between steps of one session: {max(gaps):.0f} ms",
+                 f"Stepping {self.busy_ms / self.ticks:.2f} ms and tiling {self.compose_ms / self.ticks:.2f} ms "
+                 f"per host frame (budget {self.budget_ms:.1f} ms)"]
+        games = sum(session.game.current_state != self.kbc.MAIN_MENU for session in self.sessions)
+        lines.append(f"Sessions in a game or on the result screen at the end: {games}")
+
+        memory = self.memory
+        first = memory['one_session'] - memory['before_sessions']
+        extra = (memory['all_sessions'] - memory['one_session']) / (count - 1) if count > 1 else 0
+        lines.append(f"Memory: {memory['before_sessions'] / 2 ** 20:.1f} MB with shared assets loaded, "
+                     f"first session +{first / 2 ** 20:.1f} MB, each extra session +{extra / 2 ** 20:.2f} MB")
+        if standalone:
+            lines.append(f"A standalone game process uses {standalone / 2 ** 20:.1f} MB; an extra hosted "
+                         f"session costs {100 * extra / standalone:.1f}% of that")
+        return lines
+
+
+def standalone_rss():
+    """RSS of a fresh process running one ordinary game with every screen drawn."""
+    code = ("import kbc_pygame_game as kbc, kbc_host\n"
+            "game = kbc.KBCGame(dirty_rects=False, profile=False, capture=None, stats=None)\n"
+            "game.show_splash()\n"
+            "game.draw_main_menu(); game.start_game(); game.draw_game_screen()\n"
+            "game.core.expire(); game.draw_result_screen(); game.present_frame()\n"
+            "print(kbc_host.rss_bytes())\n")
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    try:
+        return int(result.stdout.split()[-1])
+    except (IndexError, ValueError):
+        print(f"Could not measure a standalone game: {result.stderr.strip()[-200:]}")
+        return None
+
+
+def parse_size(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run many KBC sessions in one process as a tiled wall.")
+    parser.add_argument("--sessions", type=int, default=16)
+    parser.add_argument("--columns", type=int, default=None, help="tiles per row (default: square-ish)")
+    parser.add_argument("--tile", type=parse_size, default=(400, 300), help="tile size, e.g. 400x300")
+    parser.add_argument("--seconds", type=float, default=20.0, help="game time to run for")
+    parser.add_argument("--fps", type=int, default=60, help="host frame rate")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="time for stepping sessions per host frame (default: one frame)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fast", action="store_true",
+                        help="advance game time one frame per host frame instead of in real time")
+    parser.add_argument("--window", action="store_true", help="show the wall in a window")
+    parser.add_argument("--smooth", action="store_true", help="filter tiles when scaling (slower)")
+    parser.add_argument("--output", help="save the final wall as an image")
+    parser.add_argument("--no-standalone", action="store_true",
+                        help="skip measuring a standalone game process for comparison")
+    args = parser.parse_args()
+
+    if not args.window:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pygame
+
+    standalone = None if args.no_standalone else standalone_rss()
+    host = SessionHost(args.sessions, args.columns, args.tile, args.fps, args.budget_ms, args.seed,
+                       fast=args.fast, window=args.window, smooth=args.smooth)
+    host.run(args.seconds)
+    print("\n".join(host.report(standalone)))
+    if args.output:
+        pygame.image.save(host.wall, args.output)
+        print(f"Wall saved to {args.output}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Opt-in frame profiler for the game loop.
+
+The profiler times hot paths by wrapping them on the game instance when it
+is enabled, so a game started without it runs the original methods with no
+extra work at all. Per-frame section times are kept in rolling windows per
+game state, shown as p50/p95/p99 in an on-screen overlay and written to a
+JSON summary and a CSV trace when the game exits.
+
+Enable it with `python kbc_pygame_game.py --profile` or KBC_PROFILE=1.
+"""
+import csv
+import json
+import math
+import time
+from collections import deque
+
+import pygame
+
+from kbc_core import STATE_NAMES
+
+# Frames kept per state for the rolling percentiles
+WINDOW = 600
+
+# Frames kept for the exported trace
+TRACE_LIMIT = 100000
+
+# Overlay text is refreshed this often, in frames
+OVERLAY_REFRESH = 30
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(q / 100.0 * len(sorted_values)) - 1
+    return sorted_values[max(0, min(len(sorted_values) - 1, rank))]
+
+
+class FrameProfiler:
+    """Collects per-section frame timings, by game state."""
+    def __init__(self, output_prefix="kbc_profile"):
+        self.output_prefix = output_prefix
+        self.sections = []
+        self.current = {}
+        self.windows = {}
+        self.trace = deque(maxlen=TRACE_LIMIT)
+        self.frames = 0
+        self.frame_start = time.perf_counter()
+        self.overlay = None
+        self.overlay_rect = pygame.Rect(0, 0, 0, 0)
+        self.font = None
+
+    def wrap(self, owner, attr, name=None):
+        """Replace owner.attr with a timed version, recorded under `name`."""
+        name = name or attr
+        if name not in self.sections:
+            self.sections.append(name)
+        fn = getattr(owner, attr)
+        current = self.current
+        perf_counter = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                current[name] = current.get(name, 0.0) + perf_counter() - start
+        setattr(owner, attr, timed)
+
+    def instrument(self, game):
+        """Wrap the game's hot paths."""
+        self.wrap(game, 'poll_input', 'events')
+        self.wrap(game, 'update_timer')
+        self.wrap(game, 'draw_main_menu')
+        self.wrap(game, 'draw_game_screen')
+        self.wrap(game, 'draw_result_screen')
+        self.wrap(game, 'step_win_animation', 'win_animation_step')
+        self.wrap(game, 'draw_win_animation', 'win_animation_draw')
+        self.wrap(game, 'present_frame', 'present')
+        if game.capture:
+            self.wrap(game, 'capture_frame', 'capture')
+        for button in game.all_buttons():
+            self.wrap(button, 'blit', 'Button.draw')
+
+    def begin_frame(self):
+        self.frame_start = time.perf_counter()
+
+    def end_frame(self, state):
+        """Close the frame and file its section times under the game state."""
+        total = time.perf_counter() - self.frame_start
+        self.frames += 1
+        row = dict(self.current)
+        row['frame'] = total
+        self.current.clear()
+
+        state_name = STATE_NAMES.get(state, str(state))
+        window = self.windows.setdefault(state_name, {})
+        for name, seconds in row.items():
+            window.setdefault(name, deque(maxlen=WINDOW)).append(seconds * 1000)
+        self.trace.append((self.frames, state_name, row))
+
+    def summary(self):
+        """p50/p95/p99/mean in ms for every section, by state."""
+        result = {}
+        for state_name, window in self.windows.items():
+            result[state_name] = {}
+            for name, samples in window.items():
+                values = sorted(samples)
+                result[state_name][name] = {
+                    'count': len(values),
+                    'mean': sum(values) / len(values),
+                    'p50': percentile(values, 50),
+                    'p95': percentile(values, 95),
+                    'p99': percentile(values, 99)
+                }
+        return result
+
+    def draw_overlay(self, screen, state, dirty_renderer=None):
+        """Draw the percentile table for the current state in the bottom-left corner."""
+        if self.overlay is None or self.frames % OVERLAY_REFRESH == 0:
+            self.overlay = self._render_overlay(STATE_NAMES.get(state, str(state)))
+        self.overlay_rect = self.overlay.get_rect(bottomleft=(4, screen.get_height() - 4))
+        screen.blit(self.overlay, self.overlay_rect)
+        if dirty_renderer:
+            # Push the overlay now and have it restored underneath next frame
+            dirty_renderer.pending.append(self.overlay_rect.copy())
+            dirty_renderer.damage(self.overlay_rect)
+
+    def _render_overlay(self, state_name):
+        if self.font is None:
+            self.font = pygame.font.Font(None, 18)
+        stats = self.summary().get(state_name, {})
+        lines = [f"{state_name}: ms p50 / p95 / p99"]
+        for name in ['frame'] + self.sections:
+            if name in stats:
+                s = stats[name]
+                lines.append(f"{name:<20} {s['p50']:6.2f} {s['p95']:6.2f} {s['p99']:6.2f}")
+
+        line_height = self.font.get_linesize()
+        width = max(self.font.size(line)[0] for line in lines) + 8
+        overlay = pygame.Surface((width, line_height * len(lines) + 6), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 170))
+        for i, line in enumerate(lines):
+            overlay.blit(self.font.render(line, True, (255, 255, 255)), (4, 3 + i * line_height))
+        return overlay
+
+    def export(self):
+        """Write the summary as JSON and the per-frame trace as CSV; returns the paths."""
+        json_path = self.output_prefix + ".json"
+        csv_path = self.output_prefix + ".csv"
+        with open(json_path, 'w') as f:
+            json.dump({'frames': self.frames, 'states': self.summary()}, f, indent=2)
+
+        columns = ['frame'] + self.sections
+        with open(csv_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['index', 'state'] + [f"{name}_ms" for name in columns])
+            for index, state_name, row in self.trace:
+                writer.writerow([index, state_name] +
+                                [f"{row.get(name, 0.0) * 1000:.4f}" for name in columns])
+        return json_path, csv_path
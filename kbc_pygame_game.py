@@ -1,8 +1,29 @@
 import pygame
 import sys
+import math
 import random
 import time
 import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from kbc_assets import AssetCache, TextureAtlas, to_display
+from kbc_capture import FrameCapture
+from kbc_core import (CORRECT, GAME_SCREEN, MAIN_MENU, QUESTIONS_PER_GAME, RESULT_SCREEN,
+                      TIMEOUT, WON, WRONG, GameCore)
+from kbc_profiler import FrameProfiler
+from kbc_render import create_renderer, draw_sprite
+from kbc_stats import STATS_PATH, StatsStore
+from kbc_timing import FixedStep, Tween
+from question_pack import QuestionPack, pack_is_current, parse_question_line
+from question_sampler import QuestionSampler, TierIndex
+from text_layout import fit_layout, layout_text
+
+# Startup timing starts as soon as the module is imported
+STARTUP_T0 = time.perf_counter()
 
 # Initialize pygame
 pygame.init()
@@ -11,6 +32,52 @@ pygame.init()
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 
+# Set KBC_DIRTY_RECTS=1 to push only changed screen regions each frame
+DIRTY_RECTS = os.environ.get("KBC_DIRTY_RECTS") == "1"
+
+# Frame rate while animating, with optional lower caps per game state
+FPS = 60
+FRAME_CAPS = {}
+
+# Set KBC_FRAME_STATS=1 to print CPU time per frame on exit
+FRAME_STATS = os.environ.get("KBC_FRAME_STATS") == "1"
+
+# Set KBC_PROFILE=1 or pass --profile to time each part of the frame loop
+PROFILE = os.environ.get("KBC_PROFILE") == "1" or "--profile" in sys.argv
+
+# Set KBC_RENDERER=texture to draw through SDL2 textures instead of software blits
+RENDERER = os.environ.get("KBC_RENDERER", "surface")
+
+# Set KBC_CAPTURE=<name> to copy every presented frame into a shared memory
+# ring of that name for an encoder to read (see kbc_capture.py)
+CAPTURE = os.environ.get("KBC_CAPTURE")
+
+# Set KBC_STATS=0 to stop recording games for the top prizes and analytics,
+# or to a file name to record them there instead (see kbc_stats.py)
+STATS = os.environ.get("KBC_STATS", STATS_PATH)
+if STATS == "0":
+    STATS = None
+
+# Games shown on the result screen's top prizes panel
+TOP_GAMES_SIZE = 5
+
+# Set KBC_ASSET_CACHE=0 to decode and scale images on every launch
+ASSET_CACHE = os.environ.get("KBC_ASSET_CACHE") != "0"
+
+# How strongly each screen's color tints the background picture (0-255)
+BACKDROP_TINT = 200
+
+# Confetti colors on the win screen
+CONFETTI_COLORS = [(255, 0, 0), (0, 255, 0), (0, 0, 255),
+                   (255, 255, 0), (255, 0, 255), (0, 255, 255)]
+
+# Number of confetti particles in each burst on the win screen
+CONFETTI_COUNT = 100
+
+# Logo entrance: grows from 10% and fades in, timed in ms from the first frame
+LOGO_SCALE = Tween(0.1, 1.0, 300)
+LOGO_FADE = Tween(0, 255, 425)
+
 # Colors
 DARK_BLUE = (0, 0, 128)
 GOLD = (255, 215, 0)
@@ -20,17 +87,104 @@ RED = (204, 0, 0)
 GREEN = (0, 153, 0)
 PURPLE = (128, 0, 128)
 
+class LazyAsset:
+    """An asset that is loaded once, by the background loader or on first use."""
+    def __init__(self, name, load):
+        self.name = name
+        self._load = load
+        self._lock = threading.Lock()
+        self.loaded = False
+        self.value = None
+        self.load_ms = 0.0
+        self.loaded_by = None
+
+    def get(self):
+        if not self.loaded:
+            self.load()
+        return self.value
+
+    def load(self):
+        with self._lock:
+            if self.loaded:
+                return
+            start = time.perf_counter()
+            self.value = self._load()
+            self.load_ms = (time.perf_counter() - start) * 1000
+            self.loaded_by = threading.current_thread().name
+            self.loaded = True
+
+    def set(self, value):
+        with self._lock:
+            self.value = value
+            self.loaded = True
+
+class LazyFont(LazyAsset):
+    """A SysFont that is only looked up when first needed.
+
+    SysFont may scan every installed font, so it is kept off the import path.
+    Attribute access (render, size, ...) is forwarded to the real font.
+    """
+    def __init__(self, name, size, bold=False):
+        super().__init__(f"font {name} {size}{' bold' if bold else ''}",
+                         lambda: pygame.font.SysFont(name, size, bold=bold))
+
+    def __getattr__(self, attr):
+        return getattr(self.get(), attr)
+
+class AssetLoader:
+    """Loads assets one after another on a background thread.
+
+    Anything asked for before the thread reaches it is loaded right away on
+    the calling thread instead, so the game never waits on the queue order.
+    """
+    def __init__(self):
+        self.assets = OrderedDict()
+        self.thread = None
+
+    def add(self, asset):
+        if asset.name in self.assets:
+            # A second asset under one name would hide the first from the loader
+            raise ValueError(f"asset {asset.name!r} added twice")
+        self.assets[asset.name] = asset
+        return asset
+
+    def get(self, name):
+        return self.assets[name].get()
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="asset-loader", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        for asset in list(self.assets.values()):
+            asset.load()
+
+    def progress(self):
+        if not self.assets:
+            return 1.0
+        return sum(asset.loaded for asset in self.assets.values()) / len(self.assets)
+
+    def done(self):
+        return all(asset.loaded for asset in self.assets.values())
+
 # Fonts
-TITLE_FONT = pygame.font.SysFont("Arial", 48, bold=True)
-LARGE_FONT = pygame.font.SysFont("Arial", 32, bold=True)
-MEDIUM_FONT = pygame.font.SysFont("Arial", 24)
-SMALL_FONT = pygame.font.SysFont("Arial", 20)
+TITLE_FONT = LazyFont("Arial", 48, bold=True)
+LARGE_FONT = LazyFont("Arial", 32, bold=True)
+MEDIUM_FONT = LazyFont("Arial", 24)
+SMALL_FONT = LazyFont("Arial", 20)
+# Option text shrinks through these sizes until it fits its button
+OPTION_FONTS = [MEDIUM_FONT, LazyFont("Arial", 22), SMALL_FONT] + [LazyFont("Arial", size) for size in (18, 16, 14)]
+FONTS = [TITLE_FONT, LARGE_FONT] + OPTION_FONTS
 
 # Paths for assets
 ASSETS_DIR = "assets"
 if not os.path.exists(ASSETS_DIR):
     os.makedirs(ASSETS_DIR)
 
+# Question bank: pipe-delimited source and its optional compiled pack
+QUESTIONS_PATH = "questions.txt"
+QUESTION_PACK_PATH = "questions.kbcq"
+
 # Paths for images
 LOGO_PATH = os.path.join(ASSETS_DIR, "logo.png")
 BACKGROUND_PATH = os.path.join(ASSETS_DIR, "background.jpg")
@@ -43,63 +197,422 @@ WRONG_ANSWER_PATH = os.path.join(ASSETS_DIR, "wrong_answer.mp3")
 WIN_SOUND_PATH = os.path.join(ASSETS_DIR, "win_sound.mp3")
 LOSE_SOUND_PATH = os.path.join(ASSETS_DIR, "lose_sound.mp3")
 
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by font, text, color and antialias."""
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, antialias, color):
+        """Return a cached surface, rendering it only on a miss."""
+        key = (font, text, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)  # Evict least recently used
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'size': len(self.surfaces),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0
+        }
+
+# Shared text surface cache used by every draw call
+TEXT_CACHE = TextCache()
+
+def render_text(font, text, color, antialias=True):
+    """Render text through the shared cache."""
+    return TEXT_CACHE.render(font, text, antialias, color)
+
+class DirtyRenderer:
+    """Redraws only changed regions over a cached static background layer.
+
+    Each frame the game hands over a static key and background painter plus
+    a list of dynamic items as (name, key, rect, draw) tuples in paint order.
+    An item is dirty when its key or rect changed since the last frame; dirty
+    regions are restored from the background, every item overlapping them is
+    redrawn under a clip, and only those regions are pushed to the display.
+    """
+    def __init__(self, screen):
+        self.screen = screen
+        self.screen_rect = screen.get_rect()
+        self.background = pygame.Surface(screen.get_size()).convert()
+        self.static_key = None
+        self.items = {}
+        self.pending = []
+        self.damaged = []
+        self.frames = 0
+        self.last_percent = 0.0
+        self.total_percent = 0.0
+
+    def invalidate(self):
+        """Force a full redraw on the next frame."""
+        self.static_key = None
+
+    def damage(self, rect):
+        """Force a region to be restored and redrawn on the next frame."""
+        self.damaged.append(rect.copy())
+
+    def render(self, static_key, draw_static, items):
+        full = static_key != self.static_key
+        if full:
+            draw_static(self.background)
+            self.static_key = static_key
+        
+        dirty = []
+        current = {}
+        for name, key, rect, draw in items:
+            previous = self.items.get(name)
+            if previous is None or previous[0] != key or previous[1] != rect:
+                dirty.append(rect)
+                if previous is not None:
+                    dirty.append(previous[1])
+            current[name] = (key, rect)
+        for name, (key, rect) in self.items.items():
+            if name not in current:
+                dirty.append(rect)
+        self.items = current
+        dirty.extend(self.damaged)
+        self.damaged = []
+        
+        if full:
+            dirty = [self.screen_rect.copy()]
+        else:
+            dirty = self._merge(dirty)
+        
+        for region in dirty:
+            self.screen.set_clip(region)
+            self.screen.blit(self.background, region, region)
+            for name, key, rect, draw in items:
+                if rect.colliderect(region):
+                    draw(self.screen)
+        self.screen.set_clip(None)
+        
+        self.pending.extend(dirty)
+
+    def _merge(self, rects):
+        """Clip rects to the screen and merge overlapping ones."""
+        merged = []
+        for rect in rects:
+            rect = rect.clip(self.screen_rect)
+            if rect.width == 0 or rect.height == 0:
+                continue
+            # Keep absorbing overlapping rects until none are left
+            i = rect.collidelist(merged)
+            while i != -1:
+                rect.union_ip(merged.pop(i))
+                i = rect.collidelist(merged)
+            merged.append(rect)
+        return merged
+
+    def present(self):
+        """Push the regions drawn since the last call to the display."""
+        updated = sum(r.width * r.height for r in self._merge(self.pending))
+        self.last_percent = 100.0 * updated / (self.screen_rect.width * self.screen_rect.height)
+        self.total_percent += self.last_percent
+        self.frames += 1
+        
+        if self.pending:
+            pygame.display.update(self.pending)
+        self.pending = []
+
+    def stats(self):
+        return {
+            'frames': self.frames,
+            'last_updated_percent': self.last_percent,
+            'mean_updated_percent': self.total_percent / self.frames if self.frames else 0.0
+        }
+
+class ParticleSystem:
+    """Confetti particles stored as parallel NumPy arrays and updated in batch.
+
+    Particles are drawn from lazily built pre-rotated squares, one sprite per
+    color, size and angle bucket, so a frame is a single blits call of the
+    particles on screen. Texture targets draw from an atlas, whose pages are
+    uploaded again on frames that add sprites to them; surfaces draw opaque
+    color-keyed RLE copies, which blit several times faster than per-pixel
+    alpha. A rotated square has no partly transparent pixels, so both look
+    the same.
+    """
+    MIN_SIZE = 5
+    MAX_SIZE = 15
+    ANGLE_BUCKETS = 120  # 3 degrees per bucket
+    GRAVITY = 0.1
+
+    def __init__(self, colors, share_sprites_with=None):
+        self.colors = list(colors)
+        self.num_sizes = self.MAX_SIZE - self.MIN_SIZE + 1
+        if share_sprites_with is not None:
+            # Both systems fill in and draw from the same atlas
+            self.texture_atlas = share_sprites_with.texture_atlas
+            self.atlas = share_sprites_with.atlas
+            self.keyed = share_sprites_with.keyed
+            self.built = share_sprites_with.built
+            self.half_sizes = share_sprites_with.half_sizes
+        else:
+            slots = len(self.colors) * self.num_sizes * self.ANGLE_BUCKETS
+            self.texture_atlas = TextureAtlas()
+            self.atlas = np.empty(slots, dtype=object)
+            self.keyed = np.empty(slots, dtype=object)
+            self.built = np.zeros(slots, dtype=bool)
+            self.half_sizes = np.zeros(slots, dtype=np.int32)
+        # Any gray that is not a confetti color can mark the transparent corners
+        self.colorkey = next((v, v, v) for v in range(256) if (v, v, v) not in self.colors)
+        self.clear()
+
+    def clear(self):
+        self.x = np.empty(0, dtype=np.float32)
+        self.y = np.empty(0, dtype=np.float32)
+        self.speed_x = np.empty(0, dtype=np.float32)
+        self.speed_y = np.empty(0, dtype=np.float32)
+        self.rotation = np.empty(0, dtype=np.float32)
+        self.rot_speed = np.empty(0, dtype=np.float32)
+        self.size = np.empty(0, dtype=np.int32)
+        self.color = np.empty(0, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.x)
+
+    def spawn(self, count, rng):
+        """Add particles scattered over the screen with upward velocities."""
+        self.x = np.concatenate([self.x, rng.integers(0, SCREEN_WIDTH, count, endpoint=True).astype(np.float32)])
+        self.y = np.concatenate([self.y, rng.integers(0, SCREEN_HEIGHT, count, endpoint=True).astype(np.float32)])
+        self.speed_x = np.concatenate([self.speed_x, rng.uniform(-3, 3, count).astype(np.float32)])
+        self.speed_y = np.concatenate([self.speed_y, rng.uniform(-8, -4, count).astype(np.float32)])
+        self.rotation = np.concatenate([self.rotation, rng.uniform(0, 360, count).astype(np.float32)])
+        self.rot_speed = np.concatenate([self.rot_speed, rng.uniform(-5, 5, count).astype(np.float32)])
+        self.size = np.concatenate([self.size, rng.integers(self.MIN_SIZE, self.MAX_SIZE, count, endpoint=True).astype(np.int32)])
+        self.color = np.concatenate([self.color, rng.integers(0, len(self.colors), count).astype(np.int32)])
+
+    def step(self):
+        """Advance every particle one frame and drop the ones that fell off-screen."""
+        self.y += self.speed_y
+        self.x += self.speed_x
+        self.speed_y += self.GRAVITY
+        self.rotation += self.rot_speed
+        
+        keep = self.y <= SCREEN_HEIGHT + 50
+        if not keep.all():
+            self.x = self.x[keep]
+            self.y = self.y[keep]
+            self.speed_x = self.speed_x[keep]
+            self.speed_y = self.speed_y[keep]
+            self.rotation = self.rotation[keep]
+            self.rot_speed = self.rot_speed[keep]
+            self.size = self.size[keep]
+            self.color = self.color[keep]
+
+    def bounds(self):
+        """Bounding rect of all particles, allowing for rotation."""
+        if len(self) == 0:
+            return pygame.Rect(0, 0, 0, 0)
+        # A rotated square never extends past its diagonal
+        reach = self.size * 0.75 + 1
+        left = int(np.floor((self.x - reach).min()))
+        top = int(np.floor((self.y - reach).min()))
+        right = int(np.ceil((self.x + reach).max()))
+        bottom = int(np.ceil((self.y + reach).max()))
+        return pygame.Rect(left, top, right - left + 1, bottom - top + 1)
+
+    def _build(self, index):
+        """Build the atlas and color-keyed sprites for a slot."""
+        color, rest = divmod(int(index), self.num_sizes * self.ANGLE_BUCKETS)
+        size, bucket = divmod(rest, self.ANGLE_BUCKETS)
+        size += self.MIN_SIZE
+        square = pygame.Surface((size, size), pygame.SRCALPHA)
+        square.fill(self.colors[color])
+        sprite = pygame.transform.rotate(square, bucket * 360.0 / self.ANGLE_BUCKETS)
+        self.half_sizes[index] = sprite.get_width() // 2
+        self.atlas[index] = self.texture_atlas.add(int(index), sprite)
+        keyed = pygame.Surface(sprite.get_size())
+        keyed.fill(self.colorkey)
+        keyed.blit(sprite, (0, 0))
+        keyed = to_display(keyed, alpha=False)
+        keyed.set_colorkey(self.colorkey, pygame.RLEACCEL)
+        self.keyed[index] = keyed
+        self.built[index] = True
+
+    def draw(self, surface):
+        if len(self) == 0:
+            return
+        bucket = np.rint(self.rotation * (self.ANGLE_BUCKETS / 360.0)).astype(np.int32) % self.ANGLE_BUCKETS
+        index = (self.color * self.num_sizes + (self.size - self.MIN_SIZE)) * self.ANGLE_BUCKETS + bucket
+        
+        # Fill in any slots seen for the first time
+        new = index[~self.built[index]]
+        for i in np.unique(new).tolist():
+            self._build(i)
+        textured = getattr(surface, 'transforms', False)
+        if textured:
+            # Atlas pages were uploaded when first drawn; send the ones with new sprites again
+            for page in self.texture_atlas.take_changed():
+                surface.discard(page)
+        
+        half = self.half_sizes[index]
+        left = self.x.astype(np.int32) - half
+        top = self.y.astype(np.int32) - half
+        
+        # Skip particles entirely off the target
+        width, height = surface.get_size()
+        visible = (left < width) & (top < height) & (left + 2 * half >= 0) & (top + 2 * half >= 0)
+        index, left, top = index[visible], left[visible], top[visible]
+        
+        sprites = self.atlas if textured else self.keyed
+        surface.blits(zip(sprites[index].tolist(), np.column_stack((left, top)).tolist()), doreturn=False)
+
 class Button:
-    def __init__(self, x, y, width, height, text, color, hover_color, text_color=WHITE, font=MEDIUM_FONT):
+    # Horizontal room kept free around fitted text
+    TEXT_PADDING = 16
+
+    def __init__(self, x, y, width, height, text, color, hover_color, text_color=WHITE, font=MEDIUM_FONT,
+                 fit_fonts=None):
         self.rect = pygame.Rect(x, y, width, height)
         self.text = text
         self.color = color
         self.hover_color = hover_color
         self.text_color = text_color
         self.font = font
+        
+        # Fonts from largest to smallest to shrink long text into the button
+        self.fit_fonts = fit_fonts
+        self.layout = None
         self.is_hovered = False
-        self.pulse = 0
-        self.pulse_dir = 1
         
-    def draw(self, screen):
-        # Base color based on hover state
-        color = self.hover_color if self.is_hovered else self.color
+        # Baked looks, keyed by hover state and invalidated on appearance changes
+        self._sprites = {}
+        self._baked_key = None
+        self._text_baked = False
+        
+    def _sprite_key(self):
+        return (self.text, tuple(self.color), tuple(self.hover_color),
+                tuple(self.text_color), self.font, self.rect.size)
+
+    def _bake(self, hovered):
+        """Composite the full button look into one surface."""
+        color = self.hover_color if hovered else self.color
+        width, height = self.rect.size
+        body_rect = pygame.Rect(0, 0, width, height)
+        sprite = pygame.Surface((width, height), pygame.SRCALPHA)
         
         # Create a more interesting button shape
         # Draw a rounded rectangle with a gradient effect
         for i in range(5, 0, -1):
             # Create a slightly darker shade for 3D effect
             shade = (max(0, color[0] - i*10), max(0, color[1] - i*10), max(0, color[2] - i*10))
-            rect = pygame.Rect(self.rect.x, self.rect.y + i, self.rect.width, self.rect.height - i)
-            pygame.draw.rect(screen, shade, rect, border_radius=15)
+            rect = pygame.Rect(0, i, width, height - i)
+            pygame.draw.rect(sprite, shade, rect, border_radius=15)
         
         # Main button surface
-        pygame.draw.rect(screen, color, self.rect, border_radius=15)
-        
-        # Add a glossy highlight effect
-        highlight_rect = pygame.Rect(self.rect.x + 5, self.rect.y + 5, 
-                                    self.rect.width - 10, self.rect.height // 3)
-        highlight_color = (min(255, color[0] + 40), min(255, color[1] + 40), min(255, color[2] + 40), 100)
-        pygame.draw.rect(screen, highlight_color, highlight_rect, border_radius=10)
-        
-        # Add pulsing border effect when hovered
-        if self.is_hovered:
-            self.pulse += 0.1 * self.pulse_dir
-            if self.pulse > 1.0:
-                self.pulse = 1.0
-                self.pulse_dir = -1
-            elif self.pulse < 0.3:
-                self.pulse = 0.3
-                self.pulse_dir = 1
-                
-            border_color = (255, 255, 255, int(self.pulse * 255))
-            pygame.draw.rect(screen, border_color, self.rect, 3, border_radius=15)
+        pygame.draw.rect(sprite, color, body_rect, border_radius=15)
+        
+        # Add a glossy highlight effect. The display surface has no per-pixel
+        # alpha, so shapes are baked opaque to match what was drawn before.
+        highlight_rect = pygame.Rect(5, 5, width - 10, height // 3)
+        highlight_color = (min(255, color[0] + 40), min(255, color[1] + 40), min(255, color[2] + 40))
+        pygame.draw.rect(sprite, highlight_color, highlight_rect, border_radius=10)
+        
+        # Thicker border when hovered
+        if hovered:
+            pygame.draw.rect(sprite, WHITE, body_rect, 3, border_radius=15)
+        else:
+            pygame.draw.rect(sprite, WHITE, body_rect, 2, border_radius=15)
+        
+        # Text with slight shadow, baked in only when it fits inside the button
+        if self._text_fits():
+            self._blit_text(sprite, body_rect)
+        return to_display(sprite)
+
+    def _text_size(self):
+        if self.layout:
+            return self.layout.width, self.layout.height
+        return self.font.size(self.text)
+
+    def _text_fits(self):
+        text_width, text_height = self._text_size()
+        return text_width + 4 <= self.rect.width and text_height + 4 <= self.rect.height
+
+    def _blit_text(self, target, rect):
+        if self.layout:
+            lines = self.layout.line_centers(rect.centerx, rect.centery - self.layout.height // 2 +
+                                             self.layout.line_height // 2)
         else:
-            # Regular border
-            pygame.draw.rect(screen, WHITE, self.rect, 2, border_radius=15)
+            lines = [(self.text, rect.center)]
         
-        # Text with slight shadow for better readability
-        shadow_surface = self.font.render(self.text, True, (0, 0, 0))
-        shadow_rect = shadow_surface.get_rect(center=(self.rect.centerx + 2, self.rect.centery + 2))
-        screen.blit(shadow_surface, shadow_rect)
+        for line, center in lines:
+            # Text with slight shadow for better readability
+            shadow_surface = render_text(self.font, line, (0, 0, 0))
+            shadow_rect = shadow_surface.get_rect(center=(center[0] + 2, center[1] + 2))
+            target.blit(shadow_surface, shadow_rect)
+            
+            text_surface = render_text(self.font, line, self.text_color)
+            text_rect = text_surface.get_rect(center=center)
+            target.blit(text_surface, text_rect)
+
+    def fit_text(self):
+        """Lay the text out in the largest fit font that holds it, on up to two lines."""
+        if not self.fit_fonts:
+            return
+        if self.layout is None or self.layout.text != self.text or self.layout.max_width != self._text_width():
+            self.layout = fit_layout(self.text, self.fit_fonts, self._text_width(), self.rect.height - 8)
+            self.font = self.layout.font
+
+    def _text_width(self):
+        return self.rect.width - self.TEXT_PADDING
+
+    def get_sprite(self, hovered):
+        """Return the baked sprite, rebuilding it when text, colors or size changed."""
+        self.fit_text()
+        key = self._sprite_key()
+        if key != self._baked_key:
+            self._baked_key = key
+            self._sprites = {}
+            self._text_baked = self._text_fits()
+        if hovered not in self._sprites:
+            self._sprites[hovered] = self._bake(hovered)
+        return self._sprites[hovered]
+
+    def get_bounds(self):
+        """Screen area covered by the button, including overflowing text."""
+        self.get_sprite(self.is_hovered)
+        if self._text_baked:
+            return self.rect.copy()
+        text_rect = pygame.Rect((0, 0), self._text_size())
+        text_rect.center = self.rect.center
+        return self.rect.union(text_rect).union(text_rect.move(2, 2))
+
+    def render_key(self):
+        """Changes whenever the button would look different on screen."""
+        self.fit_text()
+        return (self._sprite_key(), self.is_hovered)
+
+    def draw(self, screen):
+        self.blit(screen)
+
+    def blit(self, screen):
+        """Draw the current look."""
+        screen.blit(self.get_sprite(self.is_hovered), self.rect)
         
-        text_surface = self.font.render(self.text, True, self.text_color)
-        text_rect = text_surface.get_rect(center=self.rect.center)
-        screen.blit(text_surface, text_rect)
+        # Overflowing text is drawn on top so it can spill past the edges
+        if not self._text_baked:
+            self._blit_text(screen, self.rect)
         
     def check_hover(self, mouse_pos):
         self.is_hovered = self.rect.collidepoint(mouse_pos)
@@ -108,61 +621,313 @@ class Button:
     def is_clicked(self, mouse_pos, mouse_click):
         return self.rect.collidepoint(mouse_pos) and mouse_click
 
+class _CoreAttribute:
+    """Exposes a GameCore attribute directly on KBCGame."""
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, game, owner=None):
+        if game is None:
+            return self
+        return getattr(game.core, self.name)
+
+    def __set__(self, game, value):
+        setattr(game.core, self.name, value)
+
+class AudioManager:
+    """Plays memory-resident sounds on dedicated mixer channels.
+
+    Every track, including the looping theme and tick-tock, is decoded once
+    into a Sound by the asset loader, so switching states never touches the
+    disk. Channel 0 carries music, channel 1 the ticking and the rest form
+    a pool for sound effects; all are reserved so nothing else steals them.
+    """
+    MUSIC_CHANNEL = 0
+    TICK_CHANNEL = 1
+    SFX_CHANNELS = 4
+
+    def __init__(self, loader):
+        self.loader = loader
+        self.music = None
+        self.tick = None
+        self.sfx = []
+        self.next_sfx = 0
+
+    def setup(self):
+        """Initialize the mixer and claim channels; False if there is no audio device."""
+        try:
+            pygame.mixer.init()
+        except pygame.error:
+            print("Could not initialize audio; the game will be silent")
+            return False
+        reserved = 2 + self.SFX_CHANNELS
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), reserved))
+        pygame.mixer.set_reserved(reserved)
+        self.music = pygame.mixer.Channel(self.MUSIC_CHANNEL)
+        self.tick = pygame.mixer.Channel(self.TICK_CHANNEL)
+        self.sfx = [pygame.mixer.Channel(i) for i in range(2, reserved)]
+        return True
+
+    def ready(self):
+        return bool(self.loader.get('mixer'))
+
+    def _play_loop(self, channel, name):
+        sound = self.loader.get(name)
+        if sound and channel.get_sound() is not sound:
+            channel.play(sound, loops=-1)
+
+    def play_music(self, name):
+        """Loop a music track, leaving it alone if it is already playing."""
+        if self.ready():
+            self._play_loop(self.music, name)
+
+    def stop_music(self):
+        if self.ready():
+            self.music.stop()
+
+    def start_ticking(self):
+        if self.ready():
+            self._play_loop(self.tick, 'tick_tock')
+
+    def stop_ticking(self):
+        if self.ready():
+            self.tick.stop()
+
+    def play_sfx(self, name):
+        """Play a sound effect on an idle SFX channel, or the oldest one if all are busy."""
+        sound = self.loader.get(name) if self.ready() else None
+        if not sound:
+            return
+        for channel in self.sfx:
+            if not channel.get_busy():
+                channel.play(sound)
+                return
+        self.sfx[self.next_sfx].play(sound)
+        self.next_sfx = (self.next_sfx + 1) % len(self.sfx)
+
+class FrameScheduler:
+    """Paces the main loop: full frame rate while animating, blocking when idle.
+
+    When nothing on screen is moving the loop sleeps in pygame.event.wait
+    until input arrives (or the idle timeout passes) instead of redrawing at
+    the full frame rate. Each state can have its own frame-rate cap.
+    """
+    IDLE_TIMEOUT_MS = 1000
+
+    def __init__(self, fps=60, state_caps=None):
+        self.fps = fps
+        self.state_caps = dict(state_caps or {})
+        self.clock = pygame.time.Clock()
+        self.frames = 0
+        self.idle_frames = 0
+        self.cpu_time = 0.0
+        self.wall_time = 0.0
+        self._cpu_start = time.process_time()
+        self._wall_start = time.perf_counter()
+
+    def next_events(self, state, active):
+        """Finish the previous frame and return the events for the next one."""
+        self._end_frame()
+        self.clock.tick(self.state_caps.get(state, self.fps))
+        if active:
+            return pygame.event.get()
+        
+        # Nothing is animating: sleep until something happens
+        self.idle_frames += 1
+        event = pygame.event.wait(self.IDLE_TIMEOUT_MS)
+        events = [] if event.type == pygame.NOEVENT else [event]
+        return events + pygame.event.get()
+
+    def _end_frame(self):
+        self.cpu_time += time.process_time() - self._cpu_start
+        self.wall_time += time.perf_counter() - self._wall_start
+        self._cpu_start = time.process_time()
+        self._wall_start = time.perf_counter()
+        self.frames += 1
+
+    def stats(self):
+        return {
+            'frames': self.frames,
+            'idle_frames': self.idle_frames,
+            'cpu_ms_per_frame': 1000 * self.cpu_time / self.frames if self.frames else 0.0,
+            'cpu_percent': 100 * self.cpu_time / self.wall_time if self.wall_time else 0.0
+        }
+
+class _AssetAttribute:
+    """Exposes a lazily loaded asset directly on KBCGame."""
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, game, owner=None):
+        if game is None:
+            return self
+        return game.loader.get(self.name)
+
+    def __set__(self, game, value):
+        game.loader.assets[self.name].set(value)
+
+class _SharedAttribute:
+    """Exposes a SharedAssets attribute directly on KBCGame."""
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, game, owner=None):
+        if game is None:
+            return self
+        return getattr(game.assets, self.name)
+
+    def __set__(self, game, value):
+        setattr(game.assets, self.name, value)
+
+class SharedAssets:
+    """Fonts, images, sounds, questions and baked sprites, loaded once.
+
+    None of it changes after loading, so one instance can back any number
+    of KBCGame sessions in a process (see kbc_host.py); a game made without
+    one gets its own.
+    """
+    def __init__(self, audio=True):
+        # Processed images are kept on disk between launches
+        self.asset_cache = AssetCache(enabled=ASSET_CACHE)
+        self.backdrops = {}
+        self.logo_frames = None
+        self.questions = None
+        self.question_tiers = None
+        self.confetti = ParticleSystem(CONFETTI_COLORS)
+        
+        # Fonts, images and sounds load in the background (see KBCGame.start_loading)
+        self.original_logo_size = (150, 150)  # Use a square size
+        self.loader = AssetLoader()
+        for font in FONTS:
+            self.loader.add(font)
+        self.loader.add(LazyAsset('logo', self.load_logo))
+        self.loader.add(LazyAsset('background_image', self.load_background))
+        self.audio = AudioManager(self.loader)
+        self.loader.add(LazyAsset('mixer', self.audio.setup if audio else lambda: False))
+        for name, path in [('main_theme', MAIN_THEME_PATH), ('tick_tock', TICK_TOCK_PATH),
+                           ('correct_sound', CORRECT_ANSWER_PATH), ('wrong_sound', WRONG_ANSWER_PATH),
+                           ('win_sound', WIN_SOUND_PATH), ('lose_sound', LOSE_SOUND_PATH)]:
+            self.loader.add(LazyAsset(name, lambda path=path: self.load_sound(path)))
+    
+    def load_all(self):
+        """Load every asset on the calling thread."""
+        for asset in self.loader.assets.values():
+            asset.get()
+    
+    def load_sound(self, path):
+        """Decode a sound fully into memory, or None if it is missing or unreadable."""
+        if not self.audio.ready():
+            return None
+        try:
+            if os.path.exists(path):
+                return pygame.mixer.Sound(path)
+        except pygame.error:
+            print(f"Could not load sound effect {path}")
+        return None
+    
+    def load_logo(self):
+        """Load and scale the logo, or None to fall back to the title text."""
+        try:
+            if os.path.exists(LOGO_PATH):
+                return self.asset_cache.image(
+                    LOGO_PATH, self.original_logo_size,
+                    lambda: pygame.transform.smoothscale(pygame.image.load(LOGO_PATH), self.original_logo_size))
+        except pygame.error:
+            print(f"Could not load logo from {LOGO_PATH}")
+        return None
+    
+    def load_background(self):
+        """Load the background picture scaled to the window, or None to use flat colors."""
+        size = (SCREEN_WIDTH, SCREEN_HEIGHT)
+        try:
+            if os.path.exists(BACKGROUND_PATH):
+                return self.asset_cache.image(
+                    BACKGROUND_PATH, size,
+                    lambda: pygame.transform.smoothscale(pygame.image.load(BACKGROUND_PATH), size),
+                    alpha=False)
+        except pygame.error:
+            print(f"Could not load background from {BACKGROUND_PATH}")
+        return None
+
 class KBCGame:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Kaun Banega Crorepati")
+    logo = _AssetAttribute()
+    background_image = _AssetAttribute()
+    correct_sound = _AssetAttribute()
+    wrong_sound = _AssetAttribute()
+    win_sound = _AssetAttribute()
+    lose_sound = _AssetAttribute()
+    
+    current_state = _CoreAttribute()
+    current_question = _CoreAttribute()
+    selected_questions = _CoreAttribute()
+    prize_money = _CoreAttribute()
+    won_amount = _CoreAttribute()
+    game_won = _CoreAttribute()
+    time_left = _CoreAttribute()
+    last_time_update = _CoreAttribute()
+    
+    loader = _SharedAttribute()
+    audio = _SharedAttribute()
+    asset_cache = _SharedAttribute()
+    original_logo_size = _SharedAttribute()
+    backdrops = _SharedAttribute()
+    logo_frames = _SharedAttribute()
+    questions = _SharedAttribute()
+    question_tiers = _SharedAttribute()
+    
+    def __init__(self, dirty_rects=DIRTY_RECTS, frame_caps=FRAME_CAPS, profile=PROFILE, renderer=RENDERER,
+                 assets=None, capture=CAPTURE, stats=STATS):
+        # Everything that never changes, possibly shared with other sessions
+        self.assets = assets or SharedAssets()
+        
+        self.renderer = create_renderer(renderer, (SCREEN_WIDTH, SCREEN_HEIGHT), "Kaun Banega Crorepati")
+        self.screen = self.renderer.target
+        
+        # Show the window right away while everything else loads
+        self.screen.fill(PURPLE)
+        self.renderer.present()
+        self.startup_times = {'first_frame': (time.perf_counter() - STARTUP_T0) * 1000}
+        
+        # Only redraw changed regions instead of flipping the whole screen.
+        # Textures are redrawn in full every frame, so this is software-only.
+        self.dirty_renderer = DirtyRenderer(self.screen) if dirty_rects and self.renderer.name == "surface" else None
+        
+        # Optional per-state frame-rate caps, e.g. {MAIN_MENU: 30}
+        self.frame_caps = frame_caps
         
         # Game states
-        self.MAIN_MENU = 0
-        self.GAME_SCREEN = 1
-        self.RESULT_SCREEN = 2
-        self.current_state = self.MAIN_MENU
+        self.MAIN_MENU = MAIN_MENU
+        self.GAME_SCREEN = GAME_SCREEN
+        self.RESULT_SCREEN = RESULT_SCREEN
         
-        # Game variables
-        self.questions = []
-        self.current_question = 0
-        self.selected_questions = []
-        self.prize_money = [1000, 2000, 3000, 5000, 10000, 20000, 40000, 80000, 
-                           160000, 320000, 640000, 1250000, 2500000, 5000000, 10000000]
-        self.won_amount = 0
-        self.game_won = False
+        # Game rules, state and timer live in the pygame-free core
+        self.core = GameCore()
         
-        # Timer variables
-        self.time_left = 30
-        self.last_time_update = 0
+        # Clock and mouse the game loop reads; input replay swaps these out
+        self.ticks = pygame.time.get_ticks
+        self.read_mouse = pygame.mouse.get_pos
+        self._question_layout = None
         
         # Animation variables
         self.logo_scale = 0.1
         self.logo_alpha = 0
         self.logo_animation_done = False
-        self.win_particles = []
-        self.confetti_colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255), 
-                               (255, 255, 0), (255, 0, 255), (0, 255, 255)]
-        
-        # Sound effects
-        pygame.mixer.init()
-        self.correct_sound = None
-        self.wrong_sound = None
-        self.win_sound = None
-        self.lose_sound = None
-        self.tick_sound = None
-        
-        # Try to load sounds
-        try:
-            if os.path.exists(CORRECT_ANSWER_PATH):
-                self.correct_sound = pygame.mixer.Sound(CORRECT_ANSWER_PATH)
-            if os.path.exists(WRONG_ANSWER_PATH):
-                self.wrong_sound = pygame.mixer.Sound(WRONG_ANSWER_PATH)
-            if os.path.exists(WIN_SOUND_PATH):
-                self.win_sound = pygame.mixer.Sound(WIN_SOUND_PATH)
-            if os.path.exists(LOSE_SOUND_PATH):
-                self.lose_sound = pygame.mixer.Sound(LOSE_SOUND_PATH)
-        except:
-            print("Could not load some sound effects")
-        
-        # Load questions
-        self.load_questions()
+        self.logo_started = None
+        self.logo_frame = 0
+        self.win_frame = 0
+        self.confetti_steps = FixedStep(1000 / FPS)
+        self.confetti_colors = CONFETTI_COLORS
+        self.confetti_count = CONFETTI_COUNT
+        self.win_particles = ParticleSystem(self.confetti_colors, share_sprites_with=self.assets.confetti)
+        self.confetti_rng = np.random.default_rng(random.getrandbits(64))
+        
+        # Load questions, unless another session already has
+        start = time.perf_counter()
+        if self.questions is None:
+            self.load_questions()
+        else:
+            self.question_sampler = self.new_question_sampler()
+        self.startup_times['questions'] = (time.perf_counter() - start) * 1000
         
         # Create buttons for main menu
         self.start_button = Button(SCREEN_WIDTH//2 - 100, 300, 200, 60, "Start Game", LIGHT_BLUE, GREEN)
@@ -180,404 +945,651 @@ class KBCGame:
                 idx = i * 2 + j
                 x = 100 + j * 300
                 y = 350 + i * 100
-                button = Button(x, y, 250, 70, f"{option_letters[idx]}. Option", LIGHT_BLUE, (100, 150, 255))
+                button = Button(x, y, 250, 70, f"{option_letters[idx]}. Option", LIGHT_BLUE, (100, 150, 255),
+                                fit_fonts=OPTION_FONTS)
                 self.option_buttons.append(button)
         
-        # Try to load logo (placeholder)
-        self.logo = None
-        self.original_logo_size = (150, 150)  # Use a square size
-        try:
-            if os.path.exists(LOGO_PATH):
-                self.logo = pygame.image.load(LOGO_PATH)
-                self.logo = pygame.transform.smoothscale(self.logo, self.original_logo_size)
-        except:
-            print(f"Could not load logo from {LOGO_PATH}")
+        # Frames are copied out for broadcast only when asked for
+        self.capture = FrameCapture(capture) if capture else None
+        
+        # Answers and results are written to disk on the store's own thread
+        self.stats = None
+        self.stats_game = None
+        self.top_games = []
+        if stats:
+            try:
+                self.stats = StatsStore(stats)
+                self.stats.request_top_games(TOP_GAMES_SIZE, self.set_top_games)
+            except (OSError, sqlite3.Error) as e:
+                print(f"Could not open stats store {stats}: {e}")
+        
+        # Instrumentation wraps methods only when enabled, so it costs nothing otherwise
+        self.profiler = None
+        if profile:
+            self.profiler = FrameProfiler()
+            self.profiler.instrument(self)
+        
+        self.startup_times['init'] = (time.perf_counter() - STARTUP_T0) * 1000
+    
+    def backdrop(self, color):
+        """Painter for a screen's static background: the picture tinted with the screen color."""
+        if self.background_image is None:
+            return lambda surface: surface.fill(color)
+        if color not in self.backdrops:
+            image = self.background_image.copy()
+            tint = pygame.Surface(image.get_size())
+            tint.fill(color)
+            tint.set_alpha(BACKDROP_TINT)
+            image.blit(tint, (0, 0))
+            self.backdrops[color] = image
+        image = self.backdrops[color]
+        return lambda surface: surface.blit(image, (0, 0))
+    
+    def start_loading(self):
+        """Start loading assets in the background."""
+        if self.loader.thread is None:
+            self.loader.start()
+    
+    def show_splash(self):
+        """Show a progress bar until every asset is loaded; False if the window was closed."""
+        self.start_loading()
+        # The default font needs no system font scan, so it is ready immediately
+        font = pygame.font.Font(None, 32)
+        clock = pygame.time.Clock()
+        bar = pygame.Rect(SCREEN_WIDTH//2 - 200, SCREEN_HEIGHT//2 + 20, 400, 24)
+        frame = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        while not self.loader.done():
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    return False
             
-    def animate_logo(self):
-        """Animate the logo entrance"""
+            frame.fill(PURPLE)
+            text = font.render("Loading...", True, GOLD)
+            frame.blit(text, text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 20)))
+            pygame.draw.rect(frame, WHITE, bar, 2, border_radius=6)
+            filled = bar.inflate(-6, -6)
+            filled.width = int(filled.width * self.loader.progress())
+            pygame.draw.rect(frame, GOLD, filled, border_radius=4)
+            self.renderer.present_surface(frame)
+            clock.tick(30)
+        
+        if self.dirty_renderer:
+            self.dirty_renderer.invalidate()
+        self.startup_times['assets_ready'] = (time.perf_counter() - STARTUP_T0) * 1000
+        return True
+    
+    def startup_report(self):
+        """Lines describing where startup time went."""
+        lines = [f"{'step':<28}{'ms':>10}  loaded by"]
+        for step in ('init', 'questions'):
+            lines.append(f"{step:<28}{self.startup_times.get(step, 0.0):>10.1f}")
+        for asset in self.loader.assets.values():
+            lines.append(f"{asset.name:<28}{asset.load_ms:>10.1f}  {asset.loaded_by or 'not loaded'}")
+        for step in ('first_frame', 'assets_ready'):
+            if step in self.startup_times:
+                lines.append(f"{step + ' (since import)':<28}{self.startup_times[step]:>10.1f}")
+        return lines
+            
+    def reset_logo_animation(self):
+        """Restart the logo entrance from the beginning."""
+        self.logo_animation_done = False
+        self.logo_started = None
+        self.logo_scale = 0.1
+        self.logo_alpha = 0
+        self.logo_frame = 0
+
+    @staticmethod
+    def logo_state(elapsed_ms):
+        """The logo entrance `elapsed_ms` after it began; returns (scale, alpha, done)."""
+        return LOGO_SCALE.value(elapsed_ms), LOGO_FADE.value(elapsed_ms), LOGO_FADE.done(elapsed_ms)
+
+    @staticmethod
+    def logo_frame_count():
+        """Baked frames in the entrance: one per FPS tick, including both ends."""
+        return math.ceil(LOGO_FADE.duration_ms * FPS / 1000) + 1
+
+    def update_logo_animation(self):
+        """Advance the logo entrance animation to the current time."""
         if not self.logo_animation_done:
-            if self.logo_scale < 1.0:
-                self.logo_scale += 0.05
-            else:
-                self.logo_scale = 1.0
+            now = self.ticks()
+            if self.logo_started is None:
+                self.logo_started = now
+            elapsed = now - self.logo_started
+            self.logo_scale, self.logo_alpha, self.logo_animation_done = self.logo_state(elapsed)
+            # Nearest baked frame; frames are FPS ticks apart whatever the frame rate
+            self.logo_frame = min(round(elapsed * FPS / 1000), self.logo_frame_count() - 1)
 
-            if self.logo_alpha < 255:
-                self.logo_alpha += 10
-            else:
-                self.logo_alpha = 255
-                self.logo_animation_done = True
+    def logo_bounds(self):
+        """Screen area the logo covers at full size."""
+        if self.logo:
+            return self.logo.get_rect(center=(SCREEN_WIDTH//2, 120))
+        title_rect = pygame.Rect((0, 0), TITLE_FONT.size("KAUN BANEGA CROREPATI"))
+        title_rect.center = (SCREEN_WIDTH//2, 120)
+        return title_rect
 
-            if self.logo:
-                # Always scale to a square
-                side = int(self.original_logo_size[0] * self.logo_scale)
-                current_size = (side, side)
-                scaled_logo = pygame.transform.smoothscale(self.logo, current_size)
-
-                # Create a surface with alpha for fading in
-                alpha_surface = pygame.Surface(scaled_logo.get_size(), pygame.SRCALPHA)
-                alpha = max(0, min(255, int(self.logo_alpha)))
-                alpha_surface.fill((255, 255, 255, alpha))
-                scaled_logo.blit(alpha_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
-
-                # Draw the logo
-                logo_rect = scaled_logo.get_rect(center=(SCREEN_WIDTH//2, 120))
-                self.screen.blit(scaled_logo, logo_rect)
-            else:
-                # Draw title text if no logo with animation
-                title_text = TITLE_FONT.render("KAUN BANEGA CROREPATI", True, GOLD)
-                title_rect = title_text.get_rect(center=(SCREEN_WIDTH//2, 120))
-                
-                # Apply scaling and alpha
-                scaled_text = pygame.transform.scale(title_text, 
-                                                   (int(title_text.get_width() * self.logo_scale),
-                                                    int(title_text.get_height() * self.logo_scale)))
-                alpha_surface = pygame.Surface(scaled_text.get_size(), pygame.SRCALPHA)
-                # Use RGBA format for fill
-                alpha_surface.fill((255, 255, 255, int(self.logo_alpha)))
-                scaled_text.blit(alpha_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
-                
-                scaled_rect = scaled_text.get_rect(center=(SCREEN_WIDTH//2, 120))
-                self.screen.blit(scaled_text, scaled_rect)
+    def render_logo_frame(self, scale, alpha):
+        """Render the logo at a given scale and alpha; returns (surface, rect)."""
+        if self.logo:
+            # Always scale to a square
+            side = int(self.original_logo_size[0] * scale)
+            current_size = (side, side)
+            scaled_logo = pygame.transform.smoothscale(self.logo, current_size)
+        else:
+            # Title text if no logo
+            title_text = render_text(TITLE_FONT, "KAUN BANEGA CROREPATI", GOLD)
+            scaled_logo = pygame.transform.scale(title_text, 
+                                               (int(title_text.get_width() * scale),
+                                                int(title_text.get_height() * scale)))
+
+        # Create a surface with alpha for fading in
+        alpha_surface = pygame.Surface(scaled_logo.get_size(), pygame.SRCALPHA)
+        alpha = max(0, min(255, int(alpha)))
+        alpha_surface.fill((255, 255, 255, alpha))
+        scaled_logo.blit(alpha_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+        return scaled_logo, scaled_logo.get_rect(center=(SCREEN_WIDTH//2, 120))
+
+    def bake_logo_intro(self):
+        """Render every frame of the logo entrance once and keep them for replay.
+        
+        Frames are packed into an atlas that is cached on disk with the logo.
+        """
+        count = self.logo_frame_count()
+        
+        def build(atlas):
+            for i in range(count):
+                scale, alpha, done = self.logo_state(i * 1000 / FPS)
+                atlas.add(i, self.render_logo_frame(scale, alpha)[0])
+        
+        page_size = (512, 512)
+        if self.logo and os.path.exists(LOGO_PATH):
+            params = (self.original_logo_size, count, FPS, (LOGO_SCALE.start, LOGO_SCALE.end, LOGO_SCALE.duration_ms),
+                      (LOGO_FADE.start, LOGO_FADE.end, LOGO_FADE.duration_ms))
+            atlas = self.asset_cache.atlas(LOGO_PATH, params, build, page_size)
+        else:
+            atlas = TextureAtlas(page_size)
+            build(atlas)
+        self.logo_frames = [(atlas.get(i), atlas.get(i).get_rect(center=(SCREEN_WIDTH//2, 120)))
+                            for i in range(count)]
+
+    def draw_logo(self, surface):
+        """Draw the logo at its current animation state."""
+        if not self.logo_animation_done and self.renderer.transforms:
+            # The renderer scales and fades the one logo texture itself
+            logo = self.logo or render_text(TITLE_FONT, "KAUN BANEGA CROREPATI", GOLD)
+            draw_sprite(surface, logo, (SCREEN_WIDTH//2, 120), self.logo_scale, self.logo_alpha)
+        elif not self.logo_animation_done:
+            # Baked lazily on first play and replayed on every return to the menu
+            if self.logo_frames is None:
+                self.bake_logo_intro()
+            frame, rect = self.logo_frames[self.logo_frame]
+            surface.blit(frame, rect)
         else:
             # Draw the normal logo once animation is complete
             if self.logo:
                 logo_rect = self.logo.get_rect(center=(SCREEN_WIDTH//2, 120))
-                self.screen.blit(self.logo, logo_rect)
+                surface.blit(self.logo, logo_rect)
             else:
-                title_text = TITLE_FONT.render("KAUN BANEGA CROREPATI", True, GOLD)
+                title_text = render_text(TITLE_FONT, "KAUN BANEGA CROREPATI", GOLD)
                 title_rect = title_text.get_rect(center=(SCREEN_WIDTH//2, 120))
-                self.screen.blit(title_text, title_rect)
+                surface.blit(title_text, title_rect)
+
+    def animate_logo(self):
+        """Animate the logo entrance"""
+        self.update_logo_animation()
+        self.draw_logo(self.screen)
+
+    def measure_logo_intro(self, baked=True):
+        """Time one full logo entrance offscreen; returns per-frame cost in ms.
+
+        With baked=False every frame is scaled and faded on the fly, which is
+        what the intro cost before frames were cached.
+        """
+        surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        bake_ms = 0.0
+        if baked:
+            start = time.perf_counter()
+            self.bake_logo_intro()
+            bake_ms = (time.perf_counter() - start) * 1000
+        
+        frames = self.logo_frame_count()
+        start = time.perf_counter()
+        for i in range(frames):
+            if baked:
+                frame, rect = self.logo_frames[i]
+            else:
+                scale, alpha, done = self.logo_state(i * 1000 / FPS)
+                frame, rect = self.render_logo_frame(scale, alpha)
+            surface.blit(frame, rect)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        return {
+            'frames': frames,
+            'ms_per_frame': elapsed_ms / frames,
+            'bake_ms': bake_ms
+        }
                 
     def create_win_animation(self):
         """Create particles for win animation"""
-        for _ in range(100):
-            x = random.randint(0, SCREEN_WIDTH)
-            y = random.randint(0, SCREEN_HEIGHT)
-            size = random.randint(5, 15)
-            color = random.choice(self.confetti_colors)
-            speed_x = random.uniform(-3, 3)
-            speed_y = random.uniform(-8, -4)
-            self.win_particles.append({
-                'x': x, 'y': y, 'size': size, 'color': color,
-                'speed_x': speed_x, 'speed_y': speed_y,
-                'rotation': random.uniform(0, 360),
-                'rot_speed': random.uniform(-5, 5)
-            })
+        self.win_particles.spawn(self.confetti_count, self.confetti_rng)
+    
+    def step_win_animation(self):
+        """Move win animation particles up to the current time.
+        
+        Particles move in fixed steps of one 60 FPS frame, as many as are due,
+        so they fall at the same speed at any frame rate.
+        """
+        for _ in range(self.confetti_steps.steps(self.ticks())):
+            self.win_particles.step()
+            self.win_frame += 1
+    
+    def win_animation_bounds(self):
+        return self.win_particles.bounds()
+    
+    def draw_win_animation(self, surface):
+        """Draw win animation particles."""
+        self.win_particles.draw(surface)
             
     def update_win_animation(self):
         """Update and draw win animation particles"""
-        for particle in self.win_particles[:]:
-            # Update position
-            particle['y'] += particle['speed_y']
-            particle['x'] += particle['speed_x']
-            particle['speed_y'] += 0.1  # Gravity
-            particle['rotation'] += particle['rot_speed']
-            
-            # Draw the particle (confetti)
-            particle_surface = pygame.Surface((particle['size'], particle['size']), pygame.SRCALPHA)
-            pygame.draw.rect(particle_surface, particle['color'], 
-                           (0, 0, particle['size'], particle['size']))
-            
-            # Rotate the particle
-            rotated_surface = pygame.transform.rotate(particle_surface, particle['rotation'])
-            rotated_rect = rotated_surface.get_rect(center=(int(particle['x']), int(particle['y'])))
-            self.screen.blit(rotated_surface, rotated_rect)
-            
-            # Remove particles that are off-screen
-            if particle['y'] > SCREEN_HEIGHT + 50:
-                self.win_particles.remove(particle)
+        self.step_win_animation()
+        self.draw_win_animation(self.screen)
     
-    def load_questions(self):
-        """Load questions from the text file."""
+    def load_questions(self, questions_path=QUESTIONS_PATH, pack_path=QUESTION_PACK_PATH):
+        """Load questions, preferring an up-to-date compiled pack over the text file."""
+        if pack_is_current(questions_path, pack_path):
+            try:
+                self.questions = QuestionPack(pack_path)
+                self.question_tiers = None
+                self.question_sampler = self.new_question_sampler()
+                return
+            except (OSError, ValueError) as e:
+                print(f"Could not open question pack {pack_path}: {e}")
+        
+        self.questions = []
+        self.question_tiers = None
+        skipped = 0
         try:
-            with open('questions.txt', 'r') as file:
+            with open(questions_path, 'r', encoding='utf-8') as file:
                 for line in file:
-                    line = line.strip()
-                    if line:
-                        parts = line.split('|')
-                        if len(parts) == 6:
-                            question = parts[0]
-                            options = parts[1:5]
-                            correct_answer = parts[5]
-                            self.questions.append({
-                                'question': question,
-                                'options': options,
-                                'correct': correct_answer
-                            })
+                    question = parse_question_line(line)
+                    if question:
+                        self.questions.append(question)
+                    elif line.strip():
+                        skipped += 1
         except FileNotFoundError:
-            print("Error: questions.txt file not found!")
+            print(f"Error: {questions_path} file not found!")
             pygame.quit()
             sys.exit()
+        if skipped:
+            print(f"Skipped {skipped} malformed line(s) in {questions_path}; "
+                  f"run question_import.py on it for a report")
+        self.question_sampler = self.new_question_sampler()
     
-    def draw_text_wrapped(self, text, font, color, x, y, max_width):
-        """Draw text that wraps within a given width."""
-        words = text.split(' ')
-        lines = []
-        current_line = words[0]
-        
-        for word in words[1:]:
-            test_line = current_line + ' ' + word
-            test_width = font.size(test_line)[0]
-            if test_width <= max_width:
-                current_line = test_line
-            else:
-                lines.append(current_line)
-                current_line = word
-        
-        lines.append(current_line)
+    def new_question_sampler(self):
+        """A sampler with its own repeat history over the loaded questions.
         
-        for i, line in enumerate(lines):
-            text_surface = font.render(line, True, color)
-            text_rect = text_surface.get_rect(center=(x, y + i * 30))
-            self.screen.blit(text_surface, text_rect)
+        The tier index behind it is built once and shared by every session.
+        """
+        if self.question_tiers is None:
+            self.question_tiers = TierIndex.for_questions(self.questions)
+        return QuestionSampler(self.question_tiers)
     
-    def draw_main_menu(self):
-        """Draw the main menu screen."""
-        self.screen.fill(PURPLE)
-        
-        # Draw animated logo
-        self.animate_logo()
-        
-        # Draw subtitle
-        subtitle_text = MEDIUM_FONT.render("Test Your Knowledge!", True, WHITE)
-        subtitle_rect = subtitle_text.get_rect(center=(SCREEN_WIDTH//2, 200))
-        self.screen.blit(subtitle_text, subtitle_rect)
-        
-        # Draw buttons
-        self.start_button.draw(self.screen)
-        self.exit_button.draw(self.screen)
-        
-        # Draw footer
-        footer_text = SMALL_FONT.render("© 2025 KBC Quiz Game", True, WHITE)
-        footer_rect = footer_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT - 30))
-        self.screen.blit(footer_text, footer_rect)
+    def draw_text_wrapped(self, text, font, color, x, y, max_width, surface=None):
+        """Draw text that wraps within a given width."""
+        surface = surface or self.screen
+        for line, center in layout_text(text, font, max_width).line_centers(x, y):
+            text_surface = render_text(font, line, color)
+            surface.blit(text_surface, text_surface.get_rect(center=center))
     
-    def draw_game_screen(self):
-        """Draw the game screen."""
-        self.screen.fill(DARK_BLUE)
-        
-        # Draw timer
-        timer_text = MEDIUM_FONT.render(f"Time: {self.time_left}", True, WHITE)
-        self.screen.blit(timer_text, (20, 20))
-        
-        # Draw prize
-        prize_text = MEDIUM_FONT.render(f"Prize: ₹{self.prize_money[self.current_question]:,}", True, WHITE)
-        prize_rect = prize_text.get_rect(topright=(SCREEN_WIDTH - 20, 20))
-        self.screen.blit(prize_text, prize_rect)
-        
-        # Draw question number
-        question_num_text = MEDIUM_FONT.render(f"Question {self.current_question + 1}/15", True, GOLD)
-        question_num_rect = question_num_text.get_rect(center=(SCREEN_WIDTH//2, 60))
-        self.screen.blit(question_num_text, question_num_rect)
-        
-        # Draw question
+    def question_layout(self):
+        """Layout of the current question, rebuilt only when the question changes."""
+        question = self.selected_questions[self.current_question]['question']
+        if self._question_layout is None or self._question_layout.text != question:
+            self._question_layout = layout_text(question, MEDIUM_FONT, SCREEN_WIDTH - 100)
+        return self._question_layout
+    
+    def text_item(self, name, font, text, color, **position):
+        """Dynamic layer item for a line of text."""
+        text_surface = render_text(font, text, color)
+        text_rect = text_surface.get_rect(**position)
+        return (name, (text, color), text_rect,
+                lambda surface: surface.blit(text_surface, text_rect))
+    
+    def button_item(self, name, button):
+        """Dynamic layer item for a button."""
+        return (name, button.render_key(), button.get_bounds(), button.blit)
+    
+    def draw_layers(self, static_key, draw_static, items):
+        """Draw a screen from its static background and dynamic items."""
+        if self.dirty_renderer:
+            self.dirty_renderer.render(static_key, draw_static, items)
+        else:
+            draw_static(self.screen)
+            for name, key, rect, draw in items:
+                draw(self.screen)
+    
+    def main_menu_layers(self):
+        self.update_logo_animation()
+        items = [
+            ('logo', (self.logo_frame, self.logo_animation_done),
+             self.logo_bounds(), self.draw_logo),
+            self.text_item('subtitle', MEDIUM_FONT, "Test Your Knowledge!", WHITE,
+                           center=(SCREEN_WIDTH//2, 200)),
+            self.button_item('start', self.start_button),
+            self.button_item('exit', self.exit_button),
+            self.text_item('footer', SMALL_FONT, "© 2025 KBC Quiz Game", WHITE,
+                           center=(SCREEN_WIDTH//2, SCREEN_HEIGHT - 30))
+        ]
+        return (self.MAIN_MENU,), self.backdrop(PURPLE), items
+    
+    def game_screen_layers(self):
         current_q = self.selected_questions[self.current_question]
-        self.draw_text_wrapped(current_q['question'], MEDIUM_FONT, WHITE, SCREEN_WIDTH//2, 150, SCREEN_WIDTH - 100)
+        items = [
+            self.text_item('timer', MEDIUM_FONT, f"Time: {self.time_left}", WHITE,
+                           topleft=(20, 20)),
+            self.text_item('prize', MEDIUM_FONT, f"Prize: ₹{self.prize_money[self.current_question]:,}",
+                           WHITE, topright=(SCREEN_WIDTH - 20, 20)),
+            self.text_item('question_num', MEDIUM_FONT, f"Question {self.current_question + 1}/15",
+                           GOLD, center=(SCREEN_WIDTH//2, 60))
+        ]
+        
+        # Question lines, laid out once per question
+        for i, (line, center) in enumerate(self.question_layout().line_centers(SCREEN_WIDTH//2, 150)):
+            items.append(self.text_item(f'question_{i}', MEDIUM_FONT, line, WHITE, center=center))
         
-        # Draw option buttons
+        # Option buttons
         option_letters = ['A', 'B', 'C', 'D']
         for i, button in enumerate(self.option_buttons):
             button.text = f"{option_letters[i]}. {current_q['options'][i]}"
-            button.draw(self.screen)
+            items.append(self.button_item(f'option_{i}', button))
+        return (self.GAME_SCREEN,), self.backdrop(DARK_BLUE), items
     
-    def draw_result_screen(self):
-        """Draw the result screen."""
-        self.screen.fill(DARK_BLUE)
-        
-        # Draw result title
+    def result_screen_layers(self):
+        items = []
         if self.game_won:
-            title_text = LARGE_FONT.render("Congratulations!", True, GOLD)
-            # Update and draw win animation
+            title = "Congratulations!"
+            # Update win animation; particles are drawn beneath the text
             if len(self.win_particles) == 0:
                 self.create_win_animation()
-            self.update_win_animation()
+            self.step_win_animation()
+            items.append(('confetti', self.win_frame, self.win_animation_bounds(),
+                          self.draw_win_animation))
         else:
-            title_text = LARGE_FONT.render("Game Over", True, GOLD)
-        
-        title_rect = title_text.get_rect(center=(SCREEN_WIDTH//2, 120))
-        self.screen.blit(title_text, title_rect)
-        
-        # Draw prize amount
-        prize_text = MEDIUM_FONT.render(f"You won: ₹{self.won_amount:,}", True, WHITE)
-        prize_rect = prize_text.get_rect(center=(SCREEN_WIDTH//2, 200))
-        self.screen.blit(prize_text, prize_rect)
+            title = "Game Over"
         
-        # Draw message
+        # Message
         if self.game_won:
-            msg_text = MEDIUM_FONT.render("You've reached the top prize!", True, WHITE)
+            message = "You've reached the top prize!"
         else:
             if self.won_amount > 0:
-                msg_text = MEDIUM_FONT.render("Better luck next time!", True, WHITE)
+                message = "Better luck next time!"
             else:
-                msg_text = MEDIUM_FONT.render("You didn't win any money this time.", True, WHITE)
+                message = "You didn't win any money this time."
         
-        msg_rect = msg_text.get_rect(center=(SCREEN_WIDTH//2, 260))
-        self.screen.blit(msg_text, msg_rect)
-        
-        # Draw buttons
-        self.play_again_button.draw(self.screen)
-        self.exit_result_button.draw(self.screen)
+        items += [
+            self.text_item('title', LARGE_FONT, title, GOLD, center=(SCREEN_WIDTH//2, 120)),
+            self.text_item('prize', MEDIUM_FONT, f"You won: ₹{self.won_amount:,}", WHITE,
+                           center=(SCREEN_WIDTH//2, 200)),
+            self.text_item('message', MEDIUM_FONT, message, WHITE, center=(SCREEN_WIDTH//2, 260)),
+            self.button_item('play_again', self.play_again_button),
+            self.button_item('exit', self.exit_result_button)
+        ]
+        items += self.top_games_items()
+        return (self.RESULT_SCREEN,), self.backdrop(DARK_BLUE), items
+    
+    def set_top_games(self, rows):
+        """Called from the stats writer thread with fresh top-games rows."""
+        self.top_games = rows
+    
+    def top_games_items(self):
+        """Dynamic layer items for the biggest prizes, beside the result buttons."""
+        rows = self.top_games
+        if not rows:
+            return []
+        left, right, y = SCREEN_WIDTH - 230, SCREEN_WIDTH - 20, 350
+        # The game just played stands out if it made the list
+        last_game = self.stats_game.row_id if self.stats_game else None
+        items = [self.text_item('top_games', SMALL_FONT, "Top prizes", GOLD, topleft=(left, y))]
+        for i, (game_id, _, won_amount, ended_at) in enumerate(rows):
+            y += 28
+            color = GOLD if game_id == last_game else WHITE
+            day = time.strftime('%d %b', time.localtime(ended_at / 1000))
+            items.append(self.text_item(f'top_game_{i}', SMALL_FONT, f"{i + 1}. {day}", color,
+                                        topleft=(left, y)))
+            items.append(self.text_item(f'top_game_prize_{i}', SMALL_FONT, f"₹{won_amount:,}", color,
+                                        topright=(right, y)))
+        return items
+    
+    def draw_main_menu(self):
+        """Draw the main menu screen."""
+        self.draw_layers(*self.main_menu_layers())
+    
+    def draw_game_screen(self):
+        """Draw the game screen."""
+        self.draw_layers(*self.game_screen_layers())
+    
+    def draw_result_screen(self):
+        """Draw the result screen."""
+        self.draw_layers(*self.result_screen_layers())
+    
+    def present_frame(self):
+        """Show the finished frame."""
+        if self.dirty_renderer:
+            self.dirty_renderer.present()
+        else:
+            self.renderer.present()
+    
+    def capture_frame(self):
+        """Hand the presented frame to the capture ring."""
+        # Texture frames live on the GPU and have to be read back first
+        frame = self.screen if isinstance(self.screen, pygame.Surface) else self.renderer.to_surface()
+        self.capture.write(frame, self.ticks())
     
     def start_game(self):
         """Start a new game."""
-        # Reset game variables
-        self.current_question = 0
-        self.won_amount = 0
-        self.game_won = False
-        self.time_left = 30
-        self.last_time_update = pygame.time.get_ticks()
-        self.win_particles = []
+        self.win_particles.clear()
+        self.confetti_steps.reset()
         
         # Select 15 random questions
-        if len(self.questions) < 15:
+        if len(self.questions) < QUESTIONS_PER_GAME:
             print("Error: Not enough questions in the database!")
             return
         
-        self.selected_questions = random.sample(self.questions, 15)
-        
-        # Change state to game screen
-        self.current_state = self.GAME_SCREEN
+        # One question per prize rung, easiest tier first, avoiding recent repeats
+        indices = self.question_sampler.sample_session(QUESTIONS_PER_GAME)
+        self.core.start([self.questions[i] for i in indices], self.ticks())
+        if self.stats:
+            self.stats_game = self.stats.start_game()
         
         # Play the tick-tock sound
-        if os.path.exists(TICK_TOCK_PATH):
-            pygame.mixer.music.load(TICK_TOCK_PATH)
-            pygame.mixer.music.play(-1)  # Loop the sound
+        self.audio.start_ticking()
     
     def check_answer(self, selected_option):
         """Check if the selected answer is correct."""
-        correct_option = self.selected_questions[self.current_question]['correct']
+        now = self.ticks()
+        rung = self.current_question
+        question = self.selected_questions[rung]
+        latency_ms = now - self.core.timer.started
+        outcome = self.core.check_answer(selected_option, now)
+        if self.stats:
+            self.record_answer(rung, question, selected_option, outcome, latency_ms)
         
-        if selected_option == correct_option:
-            # Correct answer
-            if self.correct_sound:
-                self.correct_sound.play()
-            
-            # Update won amount
-            self.won_amount = self.prize_money[self.current_question]
-            
-            # Move to next question
-            self.current_question += 1
-            
-            if self.current_question >= 15:
-                # Player won the game
-                self.game_won = True
-                if self.win_sound:
-                    self.win_sound.play()
-                pygame.mixer.music.stop()  # Stop the tick-tock sound
-                self.current_state = self.RESULT_SCREEN
-            else:
-                # Reset timer for next question
-                self.time_left = 30
-                self.last_time_update = pygame.time.get_ticks()
-        else:
-            # Wrong answer
-            if self.wrong_sound:
-                self.wrong_sound.play()
-            
-            if self.lose_sound:
-                self.lose_sound.play()
-            
-            pygame.mixer.music.stop()  # Stop the tick-tock sound
-            
-            # Game over, move to result screen
-            self.current_state = self.RESULT_SCREEN
+        if outcome == WRONG:
+            self.audio.play_sfx('wrong_sound')
+            self.audio.play_sfx('lose_sound')
+            self.audio.stop_ticking()
+            return
+        
+        # Correct answer
+        self.audio.play_sfx('correct_sound')
+        
+        if outcome == WON:
+            # Player won the game
+            self.audio.play_sfx('win_sound')
+            self.audio.stop_ticking()
+    
+    def record_answer(self, rung, question, selected_option, outcome, latency_ms):
+        """Queue an answer for the stats store, and the game's result once it is over."""
+        self.stats.record_answer(self.stats_game, rung, question, selected_option, outcome, latency_ms)
+        if outcome != CORRECT:
+            self.stats.end_game(self.stats_game, outcome, self.current_question, self.won_amount, self.game_won)
+            self.stats.request_top_games(TOP_GAMES_SIZE, self.set_top_games)
     
     def update_timer(self):
         """Update the timer."""
-        current_time = pygame.time.get_ticks()
-        if current_time - self.last_time_update >= 1000:  # 1 second has passed
-            self.time_left -= 1
-            self.last_time_update = current_time
+        if self.core.update_timer(self.ticks()) == TIMEOUT:
+            # Time's up
+            if self.stats:
+                rung = self.current_question
+                self.record_answer(rung, self.selected_questions[rung], None, TIMEOUT,
+                                   self.core.question_time * 1000)
+            self.audio.play_sfx('lose_sound')
+            self.audio.stop_ticking()
+    
+    def all_buttons(self):
+        return [self.start_button, self.exit_button, self.play_again_button,
+                self.exit_result_button] + self.option_buttons
+    
+    def poll_input(self, events):
+        """Read a frame's events; returns (quit requested, left click happened)."""
+        quit_requested = False
+        mouse_click = False
+        for event in events:
+            if event.type == pygame.QUIT:
+                quit_requested = True
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                if event.button == 1:  # Left mouse button
+                    mouse_click = True
+        return quit_requested, mouse_click
+    
+    def is_animating(self):
+        """True while something on screen changes without input."""
+        if self.current_state == self.MAIN_MENU:
+            return not self.logo_animation_done
+        if self.current_state == self.GAME_SCREEN:
+            return True  # Countdown
+        return self.game_won  # Confetti keeps falling on the win screen
+    
+    def step(self, events):
+        """Run one frame of the game on `events`; returns False once the game should end."""
+        if self.profiler:
+            self.profiler.begin_frame()
+        quit_requested, mouse_click = self.poll_input(events)
+        running = not quit_requested
+        mouse_pos = self.read_mouse()
+        frame_state = self.current_state
+        
+        # Handle different game states. Hover is updated before drawing
+        # so an idle frame woken by mouse motion shows the new state.
+        if self.current_state == self.MAIN_MENU:
+            # Main menu state
+            self.start_button.check_hover(mouse_pos)
+            self.exit_button.check_hover(mouse_pos)
+            self.draw_main_menu()
+            
+            # Check button interactions
+            if self.start_button.is_clicked(mouse_pos, mouse_click):
+                self.audio.stop_music()  # Stop main theme
+                self.start_game()
+            elif self.exit_button.is_clicked(mouse_pos, mouse_click):
+                running = False
+        
+        elif self.current_state == self.GAME_SCREEN:
+            # Game screen state
+            for button in self.option_buttons:
+                button.check_hover(mouse_pos)
+            self.update_timer()
+            self.draw_game_screen()
+            
+            # Check option button interactions
+            option_letters = ['A', 'B', 'C', 'D']
+            for i, button in enumerate(self.option_buttons):
+                if button.is_clicked(mouse_pos, mouse_click):
+                    self.check_answer(option_letters[i])
+        
+        elif self.current_state == self.RESULT_SCREEN:
+            # Result screen state
+            self.play_again_button.check_hover(mouse_pos)
+            self.exit_result_button.check_hover(mouse_pos)
+            self.draw_result_screen()
             
-            if self.time_left <= 0:
-                # Time's up
-                if self.lose_sound:
-                    self.lose_sound.play()
-                pygame.mixer.music.stop()  # Stop the tick-tock sound
-                self.current_state = self.RESULT_SCREEN
-    
-    def run(self):
-        """Main game loop."""
+            # Check button interactions
+            if self.play_again_button.is_clicked(mouse_pos, mouse_click):
+                # Replay the baked logo animation for main menu
+                self.reset_logo_animation()
+                
+                # Play main theme again, already decoded in memory
+                self.audio.play_music('main_theme')
+                    
+                self.current_state = self.MAIN_MENU
+            elif self.exit_result_button.is_clicked(mouse_pos, mouse_click):
+                running = False
+        
+        if self.profiler:
+            self.profiler.draw_overlay(self.screen, frame_state, self.dirty_renderer)
+        self.present_frame()
+        if self.capture:
+            self.capture_frame()
+        if self.profiler:
+            self.profiler.end_frame(frame_state)
+        return running
+    
+    def run(self, scheduler=None):
+        """Main game loop.
+        
+        `scheduler` supplies each frame's events; by default a FrameScheduler
+        reading live input (kbc_replay.py passes a recorder or replayer).
+        """
         running = True
-        clock = pygame.time.Clock()
+        scheduler = scheduler or FrameScheduler(FPS, self.frame_caps)
+        
+        if not self.show_splash():
+            pygame.quit()
+            sys.exit()
         
         # Play the main theme
-        if os.path.exists(MAIN_THEME_PATH):
-            pygame.mixer.music.load(MAIN_THEME_PATH)
-            pygame.mixer.music.play(-1)  # Loop the music
+        self.audio.play_music('main_theme')
         
         # Reset logo animation
-        self.logo_animation_done = False
-        self.logo_scale = 0.1
-        self.logo_alpha = 0
+        self.reset_logo_animation()
         
         while running:
-            mouse_pos = pygame.mouse.get_pos()
-            mouse_click = False
-            
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    if event.button == 1:  # Left mouse button
-                        mouse_click = True
-            
-            # Handle different game states
-            if self.current_state == self.MAIN_MENU:
-                # Main menu state
-                self.draw_main_menu()
-                
-                # Check button interactions
-                self.start_button.check_hover(mouse_pos)
-                self.exit_button.check_hover(mouse_pos)
-                
-                if self.start_button.is_clicked(mouse_pos, mouse_click):
-                    pygame.mixer.music.stop()  # Stop main theme
-                    self.start_game()
-                elif self.exit_button.is_clicked(mouse_pos, mouse_click):
-                    running = False
-            
-            elif self.current_state == self.GAME_SCREEN:
-                # Game screen state
-                self.update_timer()
-                self.draw_game_screen()
-                
-                # Check option button interactions
-                option_letters = ['A', 'B', 'C', 'D']
-                for i, button in enumerate(self.option_buttons):
-                    button.check_hover(mouse_pos)
-                    if button.is_clicked(mouse_pos, mouse_click):
-                        self.check_answer(option_letters[i])
-            
-            elif self.current_state == self.RESULT_SCREEN:
-                # Result screen state
-                self.draw_result_screen()
-                
-                # Check button interactions
-                self.play_again_button.check_hover(mouse_pos)
-                self.exit_result_button.check_hover(mouse_pos)
-                
-                if self.play_again_button.is_clicked(mouse_pos, mouse_click):
-                    # Reset logo animation for main menu
-                    self.logo_animation_done = False
-                    self.logo_scale = 0.1
-                    self.logo_alpha = 0
-                    
-                    # Play main theme again
-                    if os.path.exists(MAIN_THEME_PATH):
-                        pygame.mixer.music.load(MAIN_THEME_PATH)
-                        pygame.mixer.music.play(-1)
-                        
-                    self.current_state = self.MAIN_MENU
-                elif self.exit_result_button.is_clicked(mouse_pos, mouse_click):
-                    running = False
-            
-            pygame.display.flip()
-            clock.tick(60)  # 60 FPS
+            events = scheduler.next_events(self.current_state, self.is_animating())
+            running = self.step(events)
         
+        if self.profiler:
+            json_path, csv_path = self.profiler.export()
+            print(f"Profile written to {json_path} and {csv_path}")
+        if FRAME_STATS:
+            stats = scheduler.stats()
+            print(f"Frames: {stats['frames']} ({stats['idle_frames']} idle), "
+                  f"{stats['cpu_ms_per_frame']:.2f} ms CPU/frame, {stats['cpu_percent']:.1f}% CPU")
+        if self.dirty_renderer:
+            stats = self.dirty_renderer.stats()
+            print(f"Dirty rects: {stats['mean_updated_percent']:.1f}% of screen updated per frame "
+                  f"over {stats['frames']} frames")
+        if self.capture:
+            stats = self.capture.stats()
+            print(f"Capture: {stats['captured']} frames, {stats['dropped']} dropped, "
+                  f"{stats['mean_ms']:.3f} ms mean / {stats['p99_ms']:.3f} ms p99 per frame")
+            self.capture.close()
+        if self.stats:
+            # Write out whatever is still queued
+            self.stats.close()
         pygame.quit()
         sys.exit()
 
 if __name__ == "__main__":
     game = KBCGame()
+    if "--startup-report" in sys.argv:
+        game.show_splash()
+        print("\n".join(game.startup_report()))
+        pygame.quit()
+        sys.exit()
+    if "--measure-logo-intro" in sys.argv:
+        for baked in (False, True):
+            result = game.measure_logo_intro(baked=baked)
+            print(f"Logo intro {'baked' if baked else 'live'}: {result['frames']} frames, "
+                  f"{result['ms_per_frame']:.3f} ms/frame, bake {result['bake_ms']:.1f} ms")
+        pygame.quit()
+        sys.exit()
     game.run()
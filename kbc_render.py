@@ -0,0 +1,213 @@
+"""Renderer backends the game draws through.
+
+Both backends hand the game a drawing target with the Surface methods the
+draw code already uses (blit, blits, fill, get_size, ...). draw_sprite()
+draws an image scaled, faded and rotated about its centre on either one.
+
+    surface   software blits onto the pygame.display window, as before.
+              draw_sprite builds a transformed copy each call, so the game
+              keeps using pre-baked frames and sprites with this backend.
+    texture   pygame._sdl2.video Renderer and Textures. Each image is
+              uploaded once and scale, alpha and rotation are applied by the
+              renderer at draw time. Works with SDL's software renderer, so
+              it also runs headless with SDL_VIDEODRIVER=dummy.
+    offscreen draws into a plain surface and never touches the display,
+              for sessions hosted in one process (kbc_host.py).
+
+Pick surface or texture with KBC_RENDERER=surface|texture.
+"""
+import os
+import weakref
+
+import pygame
+
+from kbc_assets import to_display
+
+BACKENDS = ("surface", "texture", "offscreen")
+
+
+def create_renderer(backend, size, title):
+    if backend == "texture":
+        return TextureRenderer(size, title)
+    if backend == "offscreen":
+        return OffscreenRenderer(size)
+    if backend != "surface":
+        raise ValueError(f"unknown renderer backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+    return SurfaceRenderer(size, title)
+
+
+class SurfaceRenderer:
+    """Software blits onto the display surface."""
+    name = "surface"
+    transforms = False  # Transforms allocate; prefer pre-baked images
+
+    def __init__(self, size, title):
+        self.screen = pygame.display.set_mode(size)
+        pygame.display.set_caption(title)
+        self.target = self.screen
+
+    def present(self):
+        pygame.display.flip()
+
+    def present_surface(self, surface):
+        """Show a finished frame drawn on an ordinary surface."""
+        self.screen.blit(surface, (0, 0))
+        self.present()
+
+    def to_surface(self):
+        return self.screen.copy()
+
+
+class OffscreenRenderer:
+    """Draws into a surface of its own; presenting only counts the frame."""
+    name = "offscreen"
+    transforms = False
+
+    def __init__(self, size):
+        self.target = to_display(pygame.Surface(size), alpha=False)
+        self.frames = 0
+
+    def present(self):
+        self.frames += 1
+
+    def present_surface(self, surface):
+        self.target.blit(surface, (0, 0))
+        self.present()
+
+    def to_surface(self):
+        return self.target.copy()
+
+
+def draw_sprite(target, surface, center, scale=1.0, alpha=255, angle=0.0):
+    """Draw surface on target centred on center, scaled, faded and rotated.
+
+    The angle is counterclockwise in degrees, as in pygame.transform.rotate.
+    Texture targets transform at draw time; on a Surface target a transformed
+    copy is built for the call.
+    """
+    if getattr(target, 'transforms', False):
+        target.draw_sprite(surface, center, scale, alpha, angle)
+        return
+    if scale != 1.0 or angle:
+        surface = pygame.transform.rotozoom(surface, angle, scale)
+    if alpha < 255:
+        surface = surface.copy()
+        surface.set_alpha(max(0, int(alpha)))
+    target.blit(surface, surface.get_rect(center=center))
+
+
+class TextureRenderer:
+    """Draws through an SDL Renderer, with every image uploaded once as a texture.
+
+    This object is also the drawing target. Images are assumed not to change
+    after they are first drawn (text, baked sprites and backgrounds never
+    do); call discard after drawing on one, and use present_surface for
+    frames that are redrawn each time.
+    """
+    name = "texture"
+    transforms = True
+
+    def __init__(self, size, title, accelerated=-1):
+        from pygame._sdl2 import video
+
+        # Linear filtering for scaled textures, like smoothscale
+        os.environ.setdefault("SDL_RENDER_SCALE_QUALITY", "1")
+        self.video = video
+        self.window = video.Window(title, size)
+        try:
+            self.renderer = video.Renderer(self.window, accelerated=accelerated)
+        except pygame.error:
+            # No GPU renderer (e.g. headless): use SDL's software renderer
+            self.renderer = video.Renderer(self.window, accelerated=0)
+        self.target = self
+        self.size = tuple(size)
+        self.textures = weakref.WeakKeyDictionary()
+        self.uploads = 0
+        self._frame = None
+
+    # Surface-like drawing target
+
+    def get_size(self):
+        return self.size
+
+    def get_width(self):
+        return self.size[0]
+
+    def get_height(self):
+        return self.size[1]
+
+    def get_rect(self, **kwargs):
+        rect = pygame.Rect((0, 0), self.size)
+        for key, value in kwargs.items():
+            setattr(rect, key, value)
+        return rect
+
+    def texture(self, surface):
+        """(texture, source rect) for a surface, uploading it on first use.
+
+        Subsurfaces share their parent's texture, so an atlas is one upload.
+        """
+        offset = (0, 0)
+        source = surface
+        if surface.get_parent() is not None:
+            offset = surface.get_abs_offset()
+            source = surface.get_abs_parent()
+        texture = self.textures.get(source)
+        if texture is None:
+            texture = self.video.Texture.from_surface(self.renderer, source)
+            self.textures[source] = texture
+            self.uploads += 1
+        return texture, pygame.Rect(offset, surface.get_size())
+
+    def discard(self, surface):
+        """Drop a surface's texture so its next draw uploads it again."""
+        if surface.get_parent() is not None:
+            surface = surface.get_abs_parent()
+        self.textures.pop(surface, None)
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        texture, src = self.texture(source)
+        if area is not None:
+            area = pygame.Rect(area).clip(pygame.Rect((0, 0), src.size))
+            src = area.move(src.topleft)
+        texture.alpha = 255
+        dst = pygame.Rect(dest[0], dest[1], src.width, src.height)
+        texture.draw(srcrect=src, dstrect=dst)
+        return dst
+
+    def blits(self, blit_sequence, doreturn=True):
+        rects = [self.blit(*args) for args in blit_sequence]
+        return rects if doreturn else None
+
+    def fill(self, color, rect=None, special_flags=0):
+        self.renderer.draw_color = pygame.Color(color)
+        if rect is None:
+            self.renderer.clear()
+        else:
+            self.renderer.fill_rect(pygame.Rect(rect))
+
+    def draw_sprite(self, surface, center, scale=1.0, alpha=255, angle=0.0):
+        """Draw surface scaled, faded and rotated counterclockwise about its centre."""
+        texture, src = self.texture(surface)
+        texture.alpha = max(0, min(255, int(alpha)))
+        dst = pygame.Rect(0, 0, round(src.width * scale), round(src.height * scale))
+        dst.center = center
+        # SDL rotates clockwise
+        texture.draw(srcrect=src, dstrect=dst, angle=-angle)
+
+    # Frame control
+
+    def present(self):
+        self.renderer.present()
+
+    def present_surface(self, surface):
+        """Show a frame drawn on an ordinary surface, re-uploading it each time."""
+        if self._frame is None or (self._frame.width, self._frame.height) != surface.get_size():
+            self._frame = self.video.Texture(self.renderer, surface.get_size(), streaming=True)
+        self._frame.update(surface)
+        self.renderer.clear()
+        self._frame.draw()
+        self.renderer.present()
+
+    def to_surface(self):
+        return self.renderer.to_surface()
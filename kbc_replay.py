@@ -0,0 +1,241 @@
+"""Record a play session's input and replay it deterministically.
+
+A recording holds the random seed the game was started with and, for every
+frame of the main loop, the clock reading, the mouse position and the events
+that arrived. The game reads its clock and mouse once per frame through
+KBCGame.ticks and KBCGame.read_mouse, so feeding the same values back with
+the same seed reproduces the session frame for frame: the same questions,
+the same timeouts and the same confetti.
+
+Replays run headless and either at the recorded pace or as fast as the game
+can draw, which turns real sessions into repeatable profiling workloads.
+
+Examples:
+    python kbc_replay.py record session.kbcr.gz
+    python kbc_replay.py replay session.kbcr.gz
+    python kbc_replay.py replay session.kbcr.gz --realtime --profile
+
+Recordings are JSON lines, gzip-compressed when the name ends in .gz.
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import time
+
+import pygame
+
+FORMAT = "kbc-replay"
+# Bumped whenever the same seed stops drawing the same questions or confetti
+VERSION = 2
+
+
+def open_recording(path, mode):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def encode_event(event):
+    """[type, attrs] with only the JSON-friendly attributes of a pygame event."""
+    attrs = {}
+    for key, value in event.dict.items():
+        if isinstance(value, (bool, int, float, str)) or value is None:
+            attrs[key] = value
+        elif isinstance(value, tuple) and all(isinstance(v, (int, float)) for v in value):
+            attrs[key] = list(value)
+    return [event.type, attrs]
+
+
+def decode_event(encoded):
+    event_type, attrs = encoded
+    return pygame.event.Event(event_type, {key: tuple(value) if isinstance(value, list) else value
+                                           for key, value in attrs.items()})
+
+
+def game_fingerprint(game):
+    """What a replay must reproduce: where the session ended up."""
+    return {
+        'state': game.current_state,
+        'current_question': game.current_question,
+        'won_amount': game.won_amount,
+        'game_won': game.game_won,
+        'questions': [q['question'] for q in game.selected_questions]
+    }
+
+
+class Recorder:
+    """Wraps a FrameScheduler and writes every frame's input to a file."""
+    def __init__(self, scheduler, path, seed, game):
+        self.scheduler = scheduler
+        self.game = game
+        self.file = open_recording(path, "w")
+        self.frames = 0
+        self.frame_ticks = 0
+        self.frame_mouse = (0, 0)
+        self._write({'format': FORMAT, 'version': VERSION, 'seed': seed,
+                     'pygame': pygame.version.ver, 'question_count': len(game.questions)})
+        game.ticks = lambda: self.frame_ticks
+        game.read_mouse = lambda: self.frame_mouse
+
+    def _write(self, record):
+        self.file.write(json.dumps(record, separators=(',', ':')) + "\n")
+
+    def next_events(self, state, active):
+        events = self.scheduler.next_events(state, active)
+        self.frame_ticks = pygame.time.get_ticks()
+        self.frame_mouse = pygame.mouse.get_pos()
+        frame = [self.frame_ticks, list(self.frame_mouse)]
+        if events:
+            frame.append([encode_event(event) for event in events])
+        self._write(frame)
+        self.frames += 1
+        return events
+
+    def stats(self):
+        return self.scheduler.stats()
+
+    def close(self):
+        self._write({'end': game_fingerprint(self.game), 'frames': self.frames})
+        self.file.close()
+
+
+class Replayer:
+    """Feeds a recording back to the game in place of live input."""
+    def __init__(self, path, game, realtime=False):
+        self.game = game
+        self.realtime = realtime
+        with open_recording(path, "r") as f:
+            lines = [json.loads(line) for line in f]
+        self.header = lines[0]
+        self.end = lines[-1] if isinstance(lines[-1], dict) else None
+        self.frames = [line for line in lines[1:] if isinstance(line, list)]
+        self.index = 0
+        self.frame_ticks = self.frames[0][0] if self.frames else 0
+        self.frame_mouse = (0, 0)
+        self.started = None
+        self.cpu_started = None
+        self.frame_times = []
+        self._frame_start = None
+        game.ticks = lambda: self.frame_ticks
+        game.read_mouse = lambda: self.frame_mouse
+
+    def next_events(self, state, active):
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            self.frame_times.append((now - self._frame_start) * 1000)
+        if self.index >= len(self.frames):
+            # Recording is over; close the game if it did not quit by itself
+            self._frame_start = now
+            return [pygame.event.Event(pygame.QUIT)]
+
+        frame = self.frames[self.index]
+        self.index += 1
+        if self.started is None:
+            self.started = now
+            self.cpu_started = time.process_time()
+        if self.realtime:
+            due = self.started + (frame[0] - self.frames[0][0]) / 1000
+            if due > now:
+                time.sleep(due - now)
+        self._frame_start = time.perf_counter()
+        self.frame_ticks = frame[0]
+        self.frame_mouse = tuple(frame[1])
+        # Keep the real event queue drained so SDL does not fill up
+        pygame.event.pump()
+        return [decode_event(event) for event in frame[2]] if len(frame) > 2 else []
+
+    def stats(self):
+        frames = len(self.frame_times)
+        cpu = time.process_time() - self.cpu_started if self.started else 0.0
+        wall = time.perf_counter() - self.started if self.started else 0.0
+        return {
+            'frames': frames,
+            'idle_frames': 0,
+            'cpu_ms_per_frame': 1000 * cpu / frames if frames else 0.0,
+            'cpu_percent': 100 * cpu / wall if wall else 0.0
+        }
+
+    def report(self):
+        """Lines summarising the replay and whether it matched the recording."""
+        frame_times = sorted(self.frame_times)
+        elapsed = time.perf_counter() - self.started if self.started else 0.0
+        recorded = (self.frames[-1][0] - self.frames[0][0]) / 1000 if self.frames else 0.0
+        lines = [f"Replayed {self.index} of {len(self.frames)} frames ({recorded:.1f}s of play) "
+                 f"in {elapsed:.2f}s, {recorded / elapsed if elapsed else 0:.1f}x real time"]
+        if frame_times:
+            p50 = frame_times[len(frame_times) // 2]
+            p99 = frame_times[min(len(frame_times) - 1, int(len(frame_times) * 0.99))]
+            lines.append(f"Frame time ms: p50 {p50:.3f}  p99 {p99:.3f}  max {frame_times[-1]:.3f}")
+        if self.header.get('question_count') != len(self.game.questions):
+            lines.append(f"Warning: recorded with {self.header.get('question_count')} questions, "
+                         f"replayed with {len(self.game.questions)}")
+        if self.end:
+            if game_fingerprint(self.game) == self.end['end']:
+                lines.append("Final game state matches the recording")
+            else:
+                lines.append("Final game state differs from the recording")
+        return lines
+
+
+def record(path, seed):
+    import kbc_pygame_game as kbc
+
+    # Questions and confetti are seeded from `random` when the game is built
+    random.seed(seed)
+    game = kbc.KBCGame()
+    recorder = Recorder(kbc.FrameScheduler(kbc.FPS, game.frame_caps), path, seed, game)
+    try:
+        game.run(recorder)
+    finally:
+        recorder.close()
+        print(f"Recorded {recorder.frames} frames to {path}")
+
+
+def replay(path, realtime, profile):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import kbc_pygame_game as kbc
+
+    with open_recording(path, "r") as f:
+        header = json.loads(f.readline())
+    if header.get('format') != FORMAT or header.get('version') != VERSION:
+        print(f"Error: {path} is not a version {VERSION} recording")
+        sys.exit(1)
+
+    random.seed(header['seed'])
+    # Replays would add the recorded games to the leaderboard again
+    game = kbc.KBCGame(profile=profile, stats=None)
+    replayer = Replayer(path, game, realtime)
+    try:
+        game.run(replayer)
+    except SystemExit:
+        pass
+    print("\n".join(replayer.report()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and replay KBC play sessions.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="play normally and record the session")
+    rec.add_argument("path")
+    rec.add_argument("--seed", type=int, default=None, help="random seed (default: random)")
+
+    rep = sub.add_parser("replay", help="replay a recording headless")
+    rep.add_argument("path")
+    rep.add_argument("--realtime", action="store_true", help="keep the recorded pace instead of running flat out")
+    rep.add_argument("--profile", action="store_true", help="run the frame profiler during the replay")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        seed = args.seed if args.seed is not None else random.SystemRandom().getrandbits(64)
+        record(args.path, seed)
+    else:
+        replay(args.path, args.realtime, args.profile)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""asyncio quiz server hosting many concurrent sessions in one process.
+
+Every connection plays the same game as the pygame client: one question per
+rung of the prize ladder, a 30 second timer per question and the GameCore
+rules for answers and payouts. Question timers for all sessions live on one
+shared timer wheel rather than a task or call_later handle per session.
+
+Protocol: newline-delimited JSON over TCP.
+    client -> {"type": "start"}
+    server <- {"type": "question", "number": 1, "prize": 1000, "question": ...,
+               "options": [...], "time_left": 30}
+    client -> {"type": "answer", "option": "A"}
+    server <- {"type": "correct", "won_amount": 1000} followed by the next question,
+              or {"type": "game_over", "reason": "wrong" | "timeout" | "won",
+                  "won_amount": ..., "game_won": ..., "correct": "B"}
+    server <- {"type": "error", "message": ...} for anything it cannot read
+
+Run the server, then the bundled load test against it:
+    python kbc_server.py serve --port 8765
+    python kbc_server.py loadtest --port 8765 --connections 500 --games 4
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+
+from kbc_core import GAME_SCREEN, QUESTIONS_PER_GAME, TIMEOUT, WON, WRONG, GameCore
+from question_pack import QuestionPack, pack_is_current, parse_question_line
+from question_sampler import QuestionSampler, TierIndex
+
+QUESTIONS_PATH = "questions.txt"
+QUESTION_PACK_PATH = "questions.kbcq"
+
+
+def now_ms():
+    return time.monotonic() * 1000
+
+
+class TimerWheel:
+    """Hashed timer wheel driven by one asyncio task.
+
+    Timers are bucketed into `slots` slots of `tick_ms` each; a timer further
+    out than one revolution waits in its slot for the extra rounds. Scheduling
+    and cancelling are O(1), and the driver only touches the current slot.
+    """
+    def __init__(self, tick_ms=100, slots=512):
+        self.tick_ms = tick_ms
+        self.slots = [[] for _ in range(slots)]
+        self.position = 0
+        self.started = now_ms()
+        self.ticks = 0
+        self.pending = 0
+
+    def schedule(self, delay_ms, callback):
+        """Call callback() no sooner than delay_ms from now; returns a handle with a cancel() method.
+
+        Now lies somewhere inside the current tick, so one tick more than the
+        delay is waited; timers fire up to one tick late, never early.
+        """
+        ticks = math.ceil(delay_ms / self.tick_ms) + 1
+        # The slot comes round first after (ticks - 1) % slots + 1 ticks
+        timer = _WheelTimer(callback, (ticks - 1) // len(self.slots))
+        self.slots[(self.position + ticks) % len(self.slots)].append(timer)
+        self.pending += 1
+        return timer
+
+    async def run(self):
+        while True:
+            # Sleep to the next tick boundary so late wakeups do not accumulate drift
+            self.ticks += 1
+            delay = self.started + self.ticks * self.tick_ms - now_ms()
+            if delay > 0:
+                await asyncio.sleep(delay / 1000)
+            self.position = (self.position + 1) % len(self.slots)
+            self._fire(self.position)
+
+    def _fire(self, position):
+        due = self.slots[position]
+        keep = []
+        for timer in due:
+            if timer.cancelled:
+                self.pending -= 1
+            elif timer.rounds > 0:
+                timer.rounds -= 1
+                keep.append(timer)
+            else:
+                self.pending -= 1
+                timer.callback()
+        self.slots[position] = keep
+
+
+class _WheelTimer:
+    __slots__ = ('callback', 'rounds', 'cancelled')
+
+    def __init__(self, callback, rounds):
+        self.callback = callback
+        self.rounds = rounds
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class QuizSession:
+    """One player's game over one connection."""
+    def __init__(self, server, writer):
+        self.server = server
+        self.writer = writer
+        self.core = GameCore()
+        self.timer = None
+
+    def send(self, message):
+        self.writer.write(json.dumps(message).encode('utf-8') + b"\n")
+
+    def start(self):
+        self.core.start(self.server.draw_questions(), now_ms())
+        self.send_question()
+
+    def send_question(self):
+        core = self.core
+        question = core.selected_questions[core.current_question]
+        self._cancel_timer()
+        self.timer = self.server.wheel.schedule(core.question_time * 1000, self.on_timeout)
+        self.send({
+            'type': 'question',
+            'number': core.current_question + 1,
+            'prize': core.prize_money[core.current_question],
+            'question': question['question'],
+            'options': question['options'],
+            'time_left': core.question_time
+        })
+
+    def answer(self, option):
+        core = self.core
+        if core.current_state == GAME_SCREEN and not self._finished():
+            # The wheel may not have fired yet for an answer just past the deadline
+            if core.update_timer(now_ms()) == TIMEOUT:
+                self.on_timeout()
+                return
+            correct = core.selected_questions[core.current_question]['correct']
+            outcome = core.check_answer(option, now_ms())
+            if outcome == WRONG:
+                self.finish('wrong', correct)
+            elif outcome == WON:
+                self.finish('won', correct)
+            else:
+                self.send({'type': 'correct', 'won_amount': core.won_amount})
+                self.send_question()
+        else:
+            self.send({'type': 'error', 'message': 'no question is waiting for an answer'})
+
+    def _finished(self):
+        return self.timer is None
+
+    def on_timeout(self):
+        if self._finished():
+            return
+        now = now_ms()
+        if not self.core.timer.expired(now):
+            # Not due yet; wait out the rest of the question's own deadline
+            self.timer = self.server.wheel.schedule(self.core.timer.remaining(now), self.on_timeout)
+            return
+        correct = self.core.selected_questions[self.core.current_question]['correct']
+        self.core.expire()
+        self.finish('timeout', correct)
+
+    def finish(self, reason, correct):
+        self._cancel_timer()
+        self.server.games_finished += 1
+        self.send({
+            'type': 'game_over',
+            'reason': reason,
+            'won_amount': self.core.won_amount,
+            'game_won': self.core.game_won,
+            'correct': correct
+        })
+
+    def _cancel_timer(self):
+        if self.timer:
+            self.timer.cancel()
+            self.timer = None
+
+    def close(self):
+        self._cancel_timer()
+
+
+class QuizServer:
+    """Accepts connections and runs a QuizSession for each one."""
+    def __init__(self, questions, sampler, tick_ms=100):
+        self.questions = questions
+        self.sampler = sampler
+        self.wheel = TimerWheel(tick_ms)
+        self.sessions = 0
+        self.games_finished = 0
+
+    def draw_questions(self):
+        return [self.questions[i] for i in self.sampler.sample_session(QUESTIONS_PER_GAME)]
+
+    async def handle(self, reader, writer):
+        session = QuizSession(self, writer)
+        self.sessions += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Longer than the stream limit; readline has dropped it
+                    session.send({'type': 'error', 'message': 'line too long'})
+                    await writer.drain()
+                    continue
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    session.send({'type': 'error', 'message': 'invalid JSON'})
+                    continue
+                if not isinstance(message, dict):
+                    session.send({'type': 'error', 'message': 'message must be a JSON object'})
+                    continue
+                kind = message.get('type')
+                if kind == 'start':
+                    session.start()
+                elif kind == 'answer':
+                    session.answer(message.get('option'))
+                else:
+                    session.send({'type': 'error', 'message': f'unknown message type {kind!r}'})
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            session.close()
+            self.sessions -= 1
+            writer.close()
+
+    async def serve(self, host, port):
+        wheel_task = asyncio.create_task(self.wheel.run())
+        server = await asyncio.start_server(self.handle, host, port, limit=1 << 16, backlog=4096)
+        print(f"Serving quiz sessions on {host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            wheel_task.cancel()
+
+
+def load_question_bank(questions_path=QUESTIONS_PATH, pack_path=QUESTION_PACK_PATH):
+    """Same sources as the game: the compiled pack if current, else the text file."""
+    if pack_is_current(questions_path, pack_path):
+        try:
+            questions = QuestionPack(pack_path)
+            return questions, QuestionSampler(TierIndex.for_questions(questions))
+        except (OSError, ValueError) as e:
+            print(f"Could not open question pack {pack_path}: {e}")
+    questions = []
+    with open(questions_path, 'r', encoding='utf-8') as file:
+        for line in file:
+            question = parse_question_line(line)
+            if question:
+                questions.append(question)
+    return questions, QuestionSampler([q['difficulty'] for q in questions])
+
+
+async def load_test(host, port, connections, games):
+    """Play `games` games on each of `connections` connections at once."""
+    latencies = []
+    outcomes = {}
+
+    async def player():
+        reader, writer = await asyncio.open_connection(host, port, limit=1 << 16)
+
+        async def request(message):
+            writer.write(json.dumps(message).encode('utf-8') + b"\n")
+            await writer.drain()
+            return json.loads(await reader.readline())
+
+        for _ in range(games):
+            reply = await request({'type': 'start'})
+            while reply['type'] == 'question':
+                sent = time.perf_counter()
+                reply = await request({'type': 'answer', 'option': random.choice('ABCD')})
+                if reply['type'] == 'correct':
+                    reply = json.loads(await reader.readline())
+                latencies.append((time.perf_counter() - sent) * 1000)
+            outcomes[reply.get('reason')] = outcomes.get(reply.get('reason'), 0) + 1
+        writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(player() for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+
+    def pct(q):
+        return latencies[min(len(latencies) - 1, max(0, math.ceil(q / 100 * len(latencies)) - 1))]
+
+    sessions = connections * games
+    print(f"{sessions:,} sessions over {connections:,} connections in {elapsed:.2f}s "
+          f"({sessions / elapsed:,.0f} sessions/sec, {len(latencies) / elapsed:,.0f} answers/sec)")
+    print(f"Answer latency ms: p50 {pct(50):.2f}  p95 {pct(95):.2f}  p99 {pct(99):.2f}  max {latencies[-1]:.2f}")
+    print(f"Outcomes: {outcomes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-session KBC quiz server and load test.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="run the quiz server")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--tick-ms", type=int, default=100, help="timer wheel resolution")
+
+    test = sub.add_parser("loadtest", help="play many concurrent games against a server")
+    test.add_argument("--host", default="127.0.0.1")
+    test.add_argument("--port", type=int, default=8765)
+    test.add_argument("--connections", type=int, default=500)
+    test.add_argument("--games", type=int, default=4, help="games played on each connection")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        questions, sampler = load_question_bank()
+        server = QuizServer(questions, sampler, args.tick_ms)
+        try:
+            asyncio.run(server.serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+    else:
+        asyncio.run(load_test(args.host, args.port, args.connections, args.games))
+
+
+if __name__ == "__main__":
+    main()
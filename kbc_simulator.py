@@ -0,0 +1,160 @@
+"""Monte Carlo payout simulator built on the headless game rules.
+
+Plays many games through GameCore with a synthetic player and reports the
+payout distribution, the expected cost per game and throughput. Games are
+split into chunks and played across a process pool, so it runs on a headless
+server with no pygame installed.
+
+Player model:
+    accuracy        chance of answering the first question correctly
+    accuracy_decay  how much that chance drops with each prize rung
+    response time   log-normal seconds with a given median and sigma; an
+                    answer slower than the question timer is a timeout
+
+Example:
+    python kbc_simulator.py --games 1000000 --accuracy 0.9 --accuracy-decay 0.04
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from kbc_core import PRIZE_MONEY, QUESTION_TIME, QUESTIONS_PER_GAME, TIMEOUT, WRONG, GameCore
+
+OPTION_LETTERS = ['A', 'B', 'C', 'D']
+
+# Synthetic questions: only the correct letter matters to the rules
+SIM_QUESTIONS = [{'question': '', 'options': OPTION_LETTERS, 'correct': 'A'}] * QUESTIONS_PER_GAME
+
+
+class PlayerModel:
+    """Accuracy and response-time model for a simulated player."""
+    def __init__(self, accuracy=0.85, accuracy_decay=0.04, response_median=8.0, response_sigma=0.6):
+        self.accuracy = accuracy
+        self.accuracy_decay = accuracy_decay
+        self.response_median = response_median
+        self.response_sigma = response_sigma
+
+    def answer_chance(self, rung):
+        return min(1.0, max(0.0, self.accuracy - self.accuracy_decay * rung))
+
+
+def play_game(core, player, rng):
+    """Play one game to the end; returns (rung reached, ended by timeout)."""
+    now = 0
+    core.start(SIM_QUESTIONS, now)
+    while True:
+        rung = core.current_question
+        response_ms = int(1000 * player.response_median * math.exp(player.response_sigma * rng.standard_normal()))
+
+        # The timer runs to a deadline, so one check at answer time is enough
+        now += response_ms
+        if core.update_timer(now) == TIMEOUT:
+            return rung, True
+
+        if rng.random() < player.answer_chance(rung):
+            letter = 'A'
+        else:
+            letter = OPTION_LETTERS[1 + int(rng.integers(3))]
+        outcome = core.check_answer(letter, now)
+        if outcome == WRONG:
+            return rung, False
+        if core.game_won:
+            return core.current_question, False
+
+
+def simulate_chunk(games, player, seed):
+    """Play a chunk of games; returns counts of games by final rung and timeouts."""
+    rng = np.random.default_rng(seed)
+    core = GameCore()
+    rungs = np.zeros(QUESTIONS_PER_GAME + 1, dtype=np.int64)
+    timeouts = 0
+    for _ in range(games):
+        rung, timed_out = play_game(core, player, rng)
+        rungs[rung] += 1
+        timeouts += timed_out
+    return rungs, timeouts
+
+
+def simulate(games, player, workers=None, chunk_size=20000, seed=None):
+    """Play `games` games across a process pool and summarise the payouts."""
+    if games < 1:
+        raise ValueError("games must be at least 1")
+    workers = workers or os.cpu_count() or 1
+    chunks = [chunk_size] * (games // chunk_size)
+    if games % chunk_size:
+        chunks.append(games % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+
+    rungs = np.zeros(QUESTIONS_PER_GAME + 1, dtype=np.int64)
+    timeouts = 0
+    start = time.perf_counter()
+    if workers == 1:
+        results = map(simulate_chunk, chunks, [player] * len(chunks), seeds)
+        for chunk_rungs, chunk_timeouts in results:
+            rungs += chunk_rungs
+            timeouts += chunk_timeouts
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for chunk_rungs, chunk_timeouts in pool.map(simulate_chunk, chunks,
+                                                        [player] * len(chunks), seeds):
+                rungs += chunk_rungs
+                timeouts += chunk_timeouts
+    elapsed = time.perf_counter() - start
+
+    # A player who stops at rung r takes home the prize for the r-th question
+    payouts = np.array([0] + PRIZE_MONEY, dtype=np.float64)
+    mean = float((rungs * payouts).sum() / games)
+    variance = float((rungs * (payouts - mean) ** 2).sum() / games)
+    return {
+        'games': games,
+        'workers': workers,
+        'seconds': elapsed,
+        'games_per_sec': games / elapsed if elapsed else 0.0,
+        'expected_cost': mean,
+        'payout_stddev': math.sqrt(variance),
+        'timeout_rate': timeouts / games,
+        'distribution': {int(payouts[r]): int(rungs[r]) for r in range(len(rungs))}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate KBC games and report the payout distribution.")
+    parser.add_argument("--games", type=int, default=1000000)
+    parser.add_argument("--workers", type=int, default=None, help="processes to use (default: all CPUs)")
+    parser.add_argument("--chunk-size", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--accuracy", type=float, default=0.85)
+    parser.add_argument("--accuracy-decay", type=float, default=0.04)
+    parser.add_argument("--response-median", type=float, default=8.0, help="median answer time in seconds")
+    parser.add_argument("--response-sigma", type=float, default=0.6, help="log-normal spread of answer times")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+    if args.games < 1 or args.chunk_size < 1:
+        print("Error: --games and --chunk-size must be at least 1")
+        sys.exit(1)
+
+    player = PlayerModel(args.accuracy, args.accuracy_decay, args.response_median, args.response_sigma)
+    report = simulate(args.games, player, args.workers, args.chunk_size, args.seed)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"Played {report['games']:,} games in {report['seconds']:.1f}s "
+          f"({report['games_per_sec']:,.0f} games/sec on {report['workers']} workers)")
+    print(f"Expected cost per game: ₹{report['expected_cost']:,.2f} "
+          f"(std dev ₹{report['payout_stddev']:,.2f})")
+    print(f"Timeouts: {report['timeout_rate']:.2%} of games (timer is {QUESTION_TIME}s)")
+    print("Payout distribution:")
+    for payout, count in report['distribution'].items():
+        print(f"  ₹{payout:>12,}  {count:>12,}  {count / report['games']:8.4%}")
+
+
+if __name__ == "__main__":
+    main()
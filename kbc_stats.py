@@ -0,0 +1,402 @@
+"""Gameplay analytics and leaderboard store in SQLite.
+
+Every answer and timeout is recorded with the question asked, the prize rung
+and how long the player took, along with each game's final prize. The data
+feeds difficulty tuning and the top prizes shown on the result screen.
+
+The game thread never touches the database. It puts records on a queue and
+a writer thread takes them off in batches, each written in one transaction
+in WAL mode, so a slow disk only delays the writes. Two summary tables are
+kept up to date in the same transactions, so the usual reads never scan the
+raw rows:
+
+    question_stats  times asked, correct answers, timeouts and total answer
+                    time per question, with the correct rate and mean
+                    latency indexed for the hardest and slowest questions
+    leaderboard     games played, wins, total and best prize per player
+
+The result screen asks for the biggest single-game prizes through the same
+queue and gets them by callback, so the rows already include the game that
+just ended, and again no frame waits on the disk. Ranking games rather than
+players keeps the panel useful on a shared machine where every game is
+recorded under one login.
+
+Examples:
+    python kbc_stats.py top
+    python kbc_stats.py questions --hardest 20
+    python kbc_stats.py questions --slowest 20
+    python kbc_stats.py --db load.db fill --games 1000000   # synthetic data for load testing
+"""
+import argparse
+import getpass
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+from kbc_core import CORRECT, QUESTIONS_PER_GAME, TIMEOUT, WON
+
+STATS_PATH = "kbc_stats.db"
+
+# Records written per transaction at most, and how long a partial batch may wait
+BATCH_SIZE = 2000
+FLUSH_INTERVAL = 0.25
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    started_at INTEGER NOT NULL,
+    ended_at INTEGER,
+    outcome TEXT,
+    correct_answers INTEGER NOT NULL DEFAULT 0,
+    won_amount INTEGER NOT NULL DEFAULT 0,
+    game_won INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS games_by_prize ON games (won_amount DESC, ended_at);
+
+CREATE TABLE IF NOT EXISTS answers (
+    game_id INTEGER NOT NULL,
+    rung INTEGER NOT NULL,
+    question_key INTEGER NOT NULL,
+    selected TEXT,
+    outcome TEXT NOT NULL,
+    latency_ms INTEGER NOT NULL,
+    answered_at INTEGER NOT NULL
+);
+DROP INDEX IF EXISTS answers_by_question;
+
+CREATE TABLE IF NOT EXISTS question_stats (
+    question_key INTEGER PRIMARY KEY,
+    question TEXT NOT NULL,
+    asked INTEGER NOT NULL,
+    correct INTEGER NOT NULL,
+    timeouts INTEGER NOT NULL,
+    total_latency_ms INTEGER NOT NULL,
+    correct_rate REAL GENERATED ALWAYS AS (CAST(correct AS REAL) / asked) VIRTUAL,
+    mean_latency_ms REAL GENERATED ALWAYS AS (CAST(total_latency_ms AS REAL) / asked) VIRTUAL
+);
+CREATE INDEX IF NOT EXISTS question_stats_by_rate ON question_stats (correct_rate);
+CREATE INDEX IF NOT EXISTS question_stats_by_latency ON question_stats (mean_latency_ms);
+
+CREATE TABLE IF NOT EXISTS leaderboard (
+    player TEXT PRIMARY KEY,
+    games INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    total_won INTEGER NOT NULL,
+    best_won INTEGER NOT NULL,
+    best_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS leaderboard_by_best ON leaderboard (best_won DESC, best_at);
+"""
+
+
+def connect(path):
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # With WAL, NORMAL only risks the last transactions on power loss, never corruption
+    conn.execute("PRAGMA synchronous=NORMAL")
+    _add_rate_columns(conn)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _add_rate_columns(conn):
+    """Give question_stats tables from before the indexed rate columns those columns."""
+    columns = {row[1] for row in conn.execute("PRAGMA table_xinfo(question_stats)")}
+    if columns and 'correct_rate' not in columns:
+        conn.execute("ALTER TABLE question_stats ADD COLUMN correct_rate REAL "
+                     "GENERATED ALWAYS AS (CAST(correct AS REAL) / asked) VIRTUAL")
+        conn.execute("ALTER TABLE question_stats ADD COLUMN mean_latency_ms REAL "
+                     "GENERATED ALWAYS AS (CAST(total_latency_ms AS REAL) / asked) VIRTUAL")
+
+
+def stats_key(question):
+    """Signed 63-bit id of a question, stable across banks and runs."""
+    from question_import import question_key
+    return question_key(question['question'], question['options']) & ((1 << 63) - 1)
+
+
+def default_player():
+    try:
+        return getpass.getuser()
+    except (KeyError, OSError):
+        return "player"
+
+
+def now_ms():
+    return int(time.time() * 1000)
+
+
+class _Game:
+    """Handle for a game whose row the writer has not created yet."""
+    __slots__ = ('player', 'row_id')
+
+    def __init__(self, player):
+        self.player = player
+        self.row_id = None
+
+
+class StatsStore:
+    """Queues gameplay records and writes them on a background thread."""
+    def __init__(self, path=STATS_PATH, player=None):
+        self.path = path
+        self.player = player or os.environ.get("KBC_PLAYER") or default_player()
+        self.queue = queue.Queue()
+        self.written = 0
+        self.batches = 0
+        self.error = None
+        # Opened here so a bad path fails at startup rather than on the thread
+        connect(path).close()
+        self.thread = threading.Thread(target=self._run, name="stats-writer", daemon=True)
+        self.thread.start()
+
+    # Game thread side: only puts records on the queue
+
+    def start_game(self, player=None):
+        game = _Game(player or self.player)
+        self.queue.put(('start', game, now_ms()))
+        return game
+
+    def record_answer(self, game, rung, question, selected, outcome, latency_ms):
+        """One answer or timeout; outcome is CORRECT, WON, WRONG or TIMEOUT."""
+        self._put_answer(game, rung, stats_key(question), question['question'], selected, outcome, latency_ms)
+
+    def _put_answer(self, game, rung, key, text, selected, outcome, latency_ms):
+        self.queue.put(('answer', game, rung, key, text, selected, outcome, int(latency_ms), now_ms()))
+
+    def end_game(self, game, outcome, correct_answers, won_amount, game_won):
+        self.queue.put(('end', game, now_ms(), outcome, correct_answers, won_amount, game_won))
+
+    def request_top_games(self, count, callback):
+        """Call callback(rows) from the writer once everything queued so far is written.
+
+        Rows are as from top_games(), biggest prize first.
+        """
+        self.queue.put(('top', count, callback))
+
+    def close(self):
+        """Write everything still queued and stop the writer."""
+        self.queue.put(None)
+        self.thread.join()
+
+    # Writer thread
+
+    def _run(self):
+        conn = connect(self.path)
+        try:
+            while True:
+                batch = [self.queue.get()]
+                deadline = time.monotonic() + FLUSH_INTERVAL
+                # A leaderboard request is answered right away rather than waiting out the interval
+                while batch[-1] is not None and batch[-1][0] != 'top' and len(batch) < BATCH_SIZE:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(self.queue.get(timeout=timeout))
+                    except queue.Empty:
+                        break
+                done = batch[-1] is None
+                if done:
+                    batch.pop()
+                requests = self._write(conn, batch)
+                for count, callback in requests:
+                    callback(top_games(conn, count))
+                if done:
+                    return
+        except sqlite3.Error as e:
+            self.error = e
+            print(f"Stats store {self.path} stopped: {e}")
+        finally:
+            conn.close()
+
+    def _write(self, conn, batch):
+        """Write one batch in a transaction; returns the top-games requests in it."""
+        answers = []
+        questions = {}
+        players = {}
+        requests = []
+        with conn:
+            for record in batch:
+                kind = record[0]
+                if kind == 'answer':
+                    _, game, rung, key, text, selected, outcome, latency_ms, at = record
+                    answers.append((game.row_id, rung, key, selected, outcome, latency_ms, at))
+                    stats = questions.setdefault(key, [text, 0, 0, 0, 0])
+                    stats[1] += 1
+                    stats[2] += outcome in (CORRECT, WON)
+                    stats[3] += outcome == TIMEOUT
+                    stats[4] += latency_ms
+                elif kind == 'start':
+                    _, game, at = record
+                    game.row_id = conn.execute("INSERT INTO games (player, started_at) VALUES (?, ?)",
+                                               (game.player, at)).lastrowid
+                elif kind == 'end':
+                    _, game, at, outcome, correct_answers, won_amount, game_won = record
+                    conn.execute("UPDATE games SET ended_at = ?, outcome = ?, correct_answers = ?, "
+                                 "won_amount = ?, game_won = ? WHERE id = ?",
+                                 (at, outcome, correct_answers, won_amount, int(game_won), game.row_id))
+                    stats = players.setdefault(game.player, [0, 0, 0, -1, 0])
+                    stats[0] += 1
+                    stats[1] += bool(game_won)
+                    stats[2] += won_amount
+                    if won_amount > stats[3]:
+                        stats[3], stats[4] = won_amount, at
+                elif kind == 'top':
+                    requests.append(record[1:])
+            conn.executemany("INSERT INTO answers VALUES (?, ?, ?, ?, ?, ?, ?)", answers)
+            conn.executemany(
+                "INSERT INTO question_stats (question_key, question, asked, correct, timeouts, total_latency_ms) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (question_key) DO UPDATE SET "
+                "asked = asked + excluded.asked, correct = correct + excluded.correct, "
+                "timeouts = timeouts + excluded.timeouts, "
+                "total_latency_ms = total_latency_ms + excluded.total_latency_ms",
+                [(key, *stats) for key, stats in questions.items()])
+            conn.executemany(
+                "INSERT INTO leaderboard VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (player) DO UPDATE SET "
+                "games = games + excluded.games, wins = wins + excluded.wins, "
+                "total_won = total_won + excluded.total_won, "
+                "best_at = CASE WHEN excluded.best_won > best_won THEN excluded.best_at ELSE best_at END, "
+                "best_won = MAX(best_won, excluded.best_won)",
+                [(player, *stats) for player, stats in players.items()])
+        self.written += len(batch) - len(requests)
+        self.batches += 1
+        return requests
+
+
+def top_players(conn, count):
+    """(player, best prize, games played) from the leaderboard table, best first."""
+    return conn.execute("SELECT player, best_won, games FROM leaderboard "
+                        "ORDER BY best_won DESC, best_at LIMIT ?", (count,)).fetchall()
+
+
+def top_games(conn, count):
+    """(game id, player, prize, ended at) of the biggest single-game prizes, read off the prize index."""
+    return conn.execute("SELECT id, player, won_amount, ended_at FROM games "
+                        "WHERE won_amount > 0 AND ended_at IS NOT NULL "
+                        "ORDER BY won_amount DESC, ended_at LIMIT ?", (count,)).fetchall()
+
+
+# How question_report orders questions; each walks one of the summary table's indexes
+QUESTION_ORDERS = {
+    'hardest': "correct_rate",
+    'easiest': "correct_rate DESC",
+    'slowest': "mean_latency_ms DESC",
+}
+
+
+def question_report(conn, count, min_asked=1, order='hardest'):
+    """(question, asked, correct rate, timeout rate, mean seconds) from the summary table."""
+    return conn.execute(
+        "SELECT question, asked, correct_rate, CAST(timeouts AS REAL) / asked, mean_latency_ms / 1000 "
+        f"FROM question_stats WHERE asked >= ? ORDER BY {QUESTION_ORDERS[order]} LIMIT ?",
+        (min_asked, count)).fetchall()
+
+
+def fill(path, games, player_count=1000, seed=None):
+    """Play synthetic games into the store, for load testing; returns records per second.
+
+    Games are played on GameCore with kbc_simulator's player model and real
+    questions from the bank, so the tables fill as they would from play.
+    """
+    import numpy as np
+
+    import kbc_server
+    from kbc_core import GameCore
+    from kbc_simulator import OPTION_LETTERS, PlayerModel
+
+    bank, _ = kbc_server.load_question_bank()
+    # Hash each pooled question once rather than per answer, so the writer is what gets measured
+    pool = [bank[i] for i in range(min(len(bank), 5000))]
+    keys = [stats_key(question) for question in pool]
+    rng = np.random.default_rng(seed)
+    model = PlayerModel()
+    core = GameCore()
+    store = StatsStore(path)
+    records = 0
+    start = time.perf_counter()
+    for _ in range(games):
+        picks = rng.integers(len(pool), size=QUESTIONS_PER_GAME)
+        core.start([pool[i] for i in picks], 0)
+        game = store.start_game(f"player{int(rng.integers(player_count))}")
+        now = 0
+        while True:
+            rung = core.current_question
+            question = core.selected_questions[rung]
+            asked = now
+            now += int(1000 * model.response_median * float(np.exp(model.response_sigma * rng.standard_normal())))
+            if core.update_timer(now) == TIMEOUT:
+                outcome, selected = TIMEOUT, None
+                latency = core.question_time * 1000
+            else:
+                if rng.random() < model.answer_chance(rung):
+                    selected = question['correct']
+                else:
+                    selected = [letter for letter in OPTION_LETTERS if letter != question['correct']][int(rng.integers(3))]
+                outcome = core.check_answer(selected, now)
+                latency = now - asked
+            store._put_answer(game, rung, keys[picks[rung]], question['question'], selected, outcome, latency)
+            records += 1
+            if outcome != CORRECT:
+                break
+        store.end_game(game, outcome, core.current_question, core.won_amount, core.game_won)
+        records += 2
+        # Producing is faster than writing; keep the queue from growing without bound
+        while store.queue.qsize() > BATCH_SIZE * 20:
+            time.sleep(0.01)
+    store.close()
+    return records / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query or load-test the KBC analytics store.")
+    parser.add_argument("--db", default=STATS_PATH, help="database file")
+    sub = parser.add_subparsers(dest="command", required=True)
+    top = sub.add_parser("top", help="leaderboard and biggest single-game prizes")
+    top.add_argument("--count", type=int, default=10)
+    report = sub.add_parser("questions", help="per-question correct rate and mean answer time")
+    report.add_argument("--hardest", type=int, default=None, metavar="N", help="N lowest correct rates")
+    report.add_argument("--easiest", type=int, default=None, metavar="N", help="N highest correct rates")
+    report.add_argument("--slowest", type=int, default=None, metavar="N", help="N longest mean answer times")
+    report.add_argument("--min-asked", type=int, default=20, help="ignore questions asked fewer times")
+    load = sub.add_parser("fill", help="write synthetic games for load testing")
+    load.add_argument("--games", type=int, default=100000)
+    load.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.command == "fill":
+        rate = fill(args.db, args.games, seed=args.seed)
+        print(f"Wrote {args.games:,} games at {rate:,.0f} records/s")
+        return
+
+    if not os.path.exists(args.db):
+        print(f"Error: {args.db} not found")
+        sys.exit(1)
+    conn = connect(args.db)
+    start = time.perf_counter()
+    if args.command == "top":
+        players = top_players(conn, args.count)
+        games = top_games(conn, args.count)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{'player':<20}{'best prize':>14}{'games':>10}")
+        for player, best, played in players:
+            print(f"{player:<20}{best:>14,}{played:>10,}")
+        print(f"\n{'player':<20}{'prize':>14}  ended")
+        for _, player, won_amount, ended_at in games:
+            print(f"{player:<20}{won_amount:>14,}  {time.strftime('%Y-%m-%d %H:%M', time.localtime(ended_at / 1000))}")
+    else:
+        order, count = next(((order, getattr(args, order)) for order in QUESTION_ORDERS
+                             if getattr(args, order) is not None), ('hardest', 20))
+        rows = question_report(conn, count, args.min_asked, order)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{'asked':>8}{'correct':>9}{'timeout':>9}{'mean s':>8}  question")
+        for question, asked, correct, timeouts, mean_s in rows:
+            print(f"{asked:>8,}{correct:>9.1%}{timeouts:>9.1%}{mean_s:>8.1f}  {question[:70]}")
+    print(f"\nQuery took {elapsed:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
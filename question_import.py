@@ -0,0 +1,345 @@
+"""Streaming, parallel importer for question dumps.
+
+Reads any number of source files in large chunks and parses them across a
+process pool, so multi-gigabyte dumps are never held in memory at once.
+Two formats are understood, and may be mixed in one file:
+
+    pipe        question|A|B|C|D|correct letter[|prize rung], one per line
+                (the questions.txt format)
+    multi-line  a block per question, separated by blank lines, as in
+                assets/kbc_sample_questions.txt:
+                    Q1. Who was the first President of India?
+                        A. Dr. Rajendra Prasad
+                        B. Jawaharlal Nehru
+                        C. Mahatma Gandhi
+                        D. Sardar Patel
+                    Answer: Dr. Rajendra Prasad
+                The answer may be the option text or its letter.
+
+Whitespace is normalised and every question is checked: four non-empty,
+distinct options and a correct letter of A-D. Questions are deduplicated
+by a hash of the question and its options (in any order, ignoring case);
+the first copy wins. Accepted questions are written, in source order, to one
+bank in the pipe format, and everything that was dropped goes to a CSV
+rejection report with its source, line and reason.
+
+Example:
+    python question_import.py dump1.txt assets/kbc_sample_questions.txt \\
+        --output questions.txt --rejects rejects.csv --pack questions.kbcq
+"""
+import argparse
+import csv
+import hashlib
+import os
+import re
+import sys
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from question_pack import MAX_DIFFICULTY, compile_pack
+
+OPTION_LETTERS = ['A', 'B', 'C', 'D']
+
+# Bytes read per chunk handed to a worker
+CHUNK_SIZE = 8 * 1024 * 1024
+
+QUESTION_RE = re.compile(r"Q\d+[.):]\s*(.*)", re.IGNORECASE)
+OPTION_RE = re.compile(r"([A-D])[.):]\s*(.*)", re.IGNORECASE)
+ANSWER_RE = re.compile(r"(?:Correct\s+)?Answer\s*[:\-]\s*(.*)", re.IGNORECASE)
+ANSWER_LETTER_RE = re.compile(r"(?:Option\s+)?([A-D])[.)]?", re.IGNORECASE)
+
+
+def normalize(text):
+    """Collapse runs of whitespace to single spaces."""
+    return ' '.join(text.split())
+
+
+def question_key(question, options):
+    """64-bit content hash of a question and its options, ignoring order and case."""
+    key = '\x1f'.join([question.casefold()] + sorted(option.casefold() for option in options))
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def validate(question, options, correct, difficulty):
+    """Reason the question is unusable, or None if it is fine."""
+    if not question:
+        return "empty question"
+    if len(options) != 4:
+        return "expected four options A-D"
+    if not all(options):
+        return "empty option"
+    if len({option.casefold() for option in options}) < 4:
+        return "duplicate options"
+    if correct not in OPTION_LETTERS:
+        return f"correct answer {correct!r} is not A-D"
+    if not 0 <= difficulty <= MAX_DIFFICULTY:
+        return f"prize rung {difficulty} is not 0-{MAX_DIFFICULTY}"
+    fields = '\x1f'.join([question] + options)
+    if '|' in fields:
+        return "field contains '|'"
+    if '\ufffd' in fields:
+        return "invalid UTF-8"
+    return None
+
+
+def parse_pipe(line):
+    """(question, options, correct, difficulty) from a pipe line, or a reason string."""
+    parts = line.split('|')
+    if len(parts) not in (6, 7):
+        return f"expected 6 or 7 '|' separated fields, got {len(parts)}"
+    difficulty = 0
+    if len(parts) == 7:
+        try:
+            difficulty = int(parts[6])
+        except ValueError:
+            return f"prize rung {parts[6].strip()!r} is not a number"
+    return (normalize(parts[0]), [normalize(part) for part in parts[1:5]],
+            parts[5].strip().upper(), difficulty)
+
+
+def resolve_answer(answer, options):
+    """Letter of the option an `Answer:` line names, by text or by letter."""
+    answer = normalize(answer).casefold()
+    for letter, option in zip(OPTION_LETTERS, options):
+        if option.casefold() == answer:
+            return letter
+    match = ANSWER_LETTER_RE.fullmatch(answer)
+    return match.group(1).upper() if match else None
+
+
+class _Block:
+    """A multi-line question being collected."""
+    def __init__(self, line_no, question):
+        self.line_no = line_no
+        self.question = question
+        self.options = {}
+        self.answer = None
+        self.error = None
+
+    def parse(self):
+        """(question, options, correct, difficulty) or a reason string."""
+        if self.error:
+            return self.error
+        if self.answer is None:
+            return "missing Answer line"
+        if sorted(self.options) != OPTION_LETTERS:
+            return "expected options A-D"
+        options = [self.options[letter] for letter in OPTION_LETTERS]
+        correct = resolve_answer(self.answer, options)
+        if correct is None:
+            return f"answer {normalize(self.answer)!r} does not match any option"
+        return normalize(self.question), options, correct, 0
+
+
+def parse_chunk(data, first_line):
+    """Parse one chunk of a source file.
+
+    Returns (accepted, rejected): accepted holds (key, answer, line, text)
+    with text ready to write as a pipe line and answer a checksum of the
+    correct option; rejected holds (line, reason, text).
+    """
+    accepted = []
+    rejected = []
+
+    def finish(line_no, parsed, text):
+        if isinstance(parsed, str):
+            rejected.append((line_no, parsed, text))
+            return
+        question, options, correct, difficulty = parsed
+        reason = validate(question, options, correct, difficulty)
+        if reason:
+            rejected.append((line_no, reason, text))
+            return
+        fields = [question] + options + [correct]
+        if difficulty:
+            fields.append(str(difficulty))
+        answer = zlib.crc32(options[OPTION_LETTERS.index(correct)].casefold().encode('utf-8'))
+        accepted.append((question_key(question, options), answer, line_no, '|'.join(fields)))
+
+    block = None
+    text = data.decode('utf-8', errors='replace')
+    if first_line == 1:
+        text = text.lstrip('\ufeff')
+    for line_no, raw in enumerate(text.split('\n'), first_line):
+        line = raw.strip()
+        if not line:
+            if block:
+                finish(block.line_no, block.parse(), block.question)
+                block = None
+            continue
+
+        if line.count('|') in (5, 6):
+            # A full pipe record, even one numbered like a block's question
+            # line; it is never a continuation of the block before it
+            if block:
+                finish(block.line_no, block.parse(), block.question)
+                block = None
+            finish(line_no, parse_pipe(line), line)
+            continue
+
+        match = QUESTION_RE.match(line)
+        if match:
+            if block:
+                finish(block.line_no, block.parse(), block.question)
+            block = _Block(line_no, match.group(1))
+            continue
+
+        if block and block.answer is not None:
+            # The Answer line closes a block even without a blank line after it
+            finish(block.line_no, block.parse(), block.question)
+            block = None
+
+        if block:
+            option = OPTION_RE.match(line)
+            answer = ANSWER_RE.match(line)
+            if answer:
+                block.answer = answer.group(1)
+            elif option:
+                letter = option.group(1).upper()
+                if letter in block.options:
+                    block.error = block.error or f"option {letter} given twice"
+                block.options[letter] = normalize(option.group(2))
+            elif not block.options:
+                # Question text wrapped onto the next line
+                block.question += ' ' + line
+            else:
+                block.error = block.error or f"unexpected line {line[:40]!r}"
+            continue
+
+        if '|' in line:
+            finish(line_no, parse_pipe(line), line)
+        else:
+            rejected.append((line_no, "unrecognised line", line))
+
+    if block:
+        finish(block.line_no, block.parse(), block.question)
+    return accepted, rejected
+
+
+def read_chunks(path, chunk_size=CHUNK_SIZE):
+    """Yield (first line number, bytes) chunks that end on a record boundary.
+
+    Chunks are cut at the last blank line, LF or CRLF, so a multi-line question
+    is never split unless a single block is longer than chunk_size; files with
+    no blank lines are cut at the last newline.
+    """
+    line_no = 1
+    carry = b""
+    with open(path, 'rb') as source:
+        while True:
+            data = source.read(chunk_size)
+            if not data:
+                break
+            data = carry + data
+            blanks = [data.rfind(sep) + len(sep) for sep in (b"\n\n", b"\n\r\n") if sep in data]
+            cut = max(blanks) if blanks else data.rfind(b"\n") + 1
+            if cut <= 0:
+                carry = data
+                continue
+            chunk, carry = data[:cut], data[cut:]
+            yield line_no, chunk
+            line_no += chunk.count(b"\n")
+    if carry:
+        yield line_no, carry
+
+
+class ImportStats:
+    """Counts for the import summary."""
+    def __init__(self):
+        self.bytes = 0
+        self.accepted = 0
+        self.duplicates = 0
+        self.conflicts = 0
+        self.rejected = 0
+
+
+def import_questions(sources, output_path, rejects_path, workers=None, chunk_size=CHUNK_SIZE):
+    """Merge the sources into one deduplicated bank; returns ImportStats."""
+    workers = workers or os.cpu_count() or 1
+    stats = ImportStats()
+    # Content hash -> checksum of the correct option, to spot conflicting answers
+    seen = {}
+
+    with open(output_path, 'w', encoding='utf-8', newline='\n') as output, \
+            open(rejects_path, 'w', encoding='utf-8', newline='') as report:
+        rejects = csv.writer(report)
+        rejects.writerow(['source', 'line', 'reason', 'text'])
+
+        def merge(source, result):
+            accepted, rejected = result
+            for line_no, reason, text in rejected:
+                rejects.writerow([source, line_no, reason, text[:200]])
+            stats.rejected += len(rejected)
+            for key, answer, line_no, line in accepted:
+                previous = seen.get(key)
+                if previous is None:
+                    seen[key] = answer
+                    output.write(line + '\n')
+                    stats.accepted += 1
+                    continue
+                if previous == answer:
+                    stats.duplicates += 1
+                    rejects.writerow([source, line_no, "duplicate question", line[:200]])
+                else:
+                    stats.conflicts += 1
+                    rejects.writerow([source, line_no, "duplicate question with a different answer",
+                                      line[:200]])
+
+        def chunks():
+            for source in sources:
+                for first_line, data in read_chunks(source, chunk_size):
+                    stats.bytes += len(data)
+                    yield source, first_line, data
+
+        if workers == 1:
+            for source, first_line, data in chunks():
+                merge(source, parse_chunk(data, first_line))
+        else:
+            # Keep a bounded number of chunks in flight so memory stays flat
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for source, first_line, data in chunks():
+                    pending.append((source, pool.submit(parse_chunk, data, first_line)))
+                    if len(pending) >= workers * 2:
+                        source, future = pending.popleft()
+                        merge(source, future.result())
+                while pending:
+                    source, future = pending.popleft()
+                    merge(source, future.result())
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import question dumps into one deduplicated bank.")
+    parser.add_argument("sources", nargs="+", help="pipe or multi-line question files")
+    parser.add_argument("--output", default="questions_merged.txt", help="merged bank to write")
+    parser.add_argument("--rejects", default="rejects.csv", help="CSV report of dropped questions")
+    parser.add_argument("--pack", help="also compile the merged bank into this question pack")
+    parser.add_argument("--workers", type=int, default=None, help="processes to use (default: all CPUs)")
+    parser.add_argument("--chunk-mb", type=int, default=CHUNK_SIZE // (1024 * 1024),
+                        help="megabytes read per chunk")
+    args = parser.parse_args()
+
+    for source in args.sources:
+        if not os.path.exists(source):
+            print(f"Error: {source} not found")
+            sys.exit(1)
+
+    start = time.perf_counter()
+    stats = import_questions(args.sources, args.output, args.rejects, args.workers,
+                             args.chunk_mb * 1024 * 1024)
+    elapsed = time.perf_counter() - start
+
+    print(f"Imported {stats.accepted:,} questions into {args.output} "
+          f"({stats.bytes / 1e6:,.1f} MB in {elapsed:.2f}s, {stats.bytes / 1e6 / elapsed:,.1f} MB/s)")
+    print(f"Dropped {stats.duplicates:,} duplicates, {stats.conflicts:,} conflicting duplicates and "
+          f"{stats.rejected:,} invalid entries; see {args.rejects}")
+    if args.pack:
+        count = compile_pack(args.output, args.pack)
+        print(f"Compiled {count:,} questions into {args.pack}")
+
+
+if __name__ == "__main__":
+    main()
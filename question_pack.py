@@ -0,0 +1,190 @@
+"""Compiled question packs.
+
+A pack is a binary form of the pipe-delimited questions.txt format that can
+be memory-mapped and read one question at a time, so startup cost and memory
+stay flat no matter how large the question bank is.
+
+Layout (little-endian):
+    header       magic b"KBCQ", version u32, count u64, index offset u64,
+                 difficulty offset u64, order offset u64
+    records      UTF-8 fields joined by FIELD_SEPARATOR, one record per question
+    index        count + 1 u64 offsets of each record start (last one is the end)
+    difficulty   count u8 prize rungs (1-15), 0 for unrated questions
+    order        MAX_DIFFICULTY + 2 u64 bounds, then count u32 question indices
+                 sorted by difficulty; the questions of difficulty d are
+                 order[bounds[d]:bounds[d + 1]], so samplers need no sort
+
+A source line may carry an optional seventh field with the prize rung
+(1-15) the question is pitched at, e.g. `question|A|B|C|D|A|7`.
+
+Compile a pack with:
+    python question_pack.py questions.txt questions.kbcq
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+
+MAGIC = b"KBCQ"
+VERSION = 3
+HEADER = struct.Struct("<4sIQQQQ")
+MAX_DIFFICULTY = 15
+FIELD_SEPARATOR = "\x1f"
+
+
+def parse_question_line(line):
+    """Parse one pipe-delimited line into a question dict, or None if malformed."""
+    line = line.strip()
+    if not line:
+        return None
+    parts = line.split('|')
+    if len(parts) not in (6, 7):
+        return None
+    difficulty = 0
+    if len(parts) == 7:
+        try:
+            difficulty = int(parts[6])
+        except ValueError:
+            return None
+        if not 0 <= difficulty <= MAX_DIFFICULTY:
+            return None
+    return {
+        'question': parts[0],
+        'options': parts[1:5],
+        'correct': parts[5],
+        'difficulty': difficulty
+    }
+
+
+def compile_pack(source_path, pack_path):
+    """Compile a pipe-delimited question file into a pack; returns the question count."""
+    offsets = array('Q')
+    difficulties = bytearray()
+    tmp_path = pack_path + ".tmp"
+    with open(source_path, 'r', encoding='utf-8') as source, open(tmp_path, 'wb') as pack:
+        pack.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0, 0))
+        for line in source:
+            question = parse_question_line(line)
+            if question is None:
+                continue
+            offsets.append(pack.tell())
+            fields = [question['question']] + question['options'] + [question['correct']]
+            pack.write(FIELD_SEPARATOR.join(fields).encode('utf-8'))
+            difficulties.append(question['difficulty'])
+
+        # Index goes after the records, with a final entry marking the end
+        index_offset = pack.tell()
+        offsets.append(index_offset)
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+        offsets.tofile(pack)
+        difficulty_offset = pack.tell()
+        pack.write(difficulties)
+
+        # Question indices grouped by difficulty, found with a counting sort
+        pack.write(bytes(-pack.tell() % 8))
+        order_offset = pack.tell()
+        bounds = array('Q', [0] * (MAX_DIFFICULTY + 2))
+        for difficulty in difficulties:
+            bounds[difficulty + 1] += 1
+        for d in range(MAX_DIFFICULTY + 1):
+            bounds[d + 1] += bounds[d]
+        cursor = array('Q', bounds)
+        order = array('I', bytes(4 * len(difficulties)))
+        for i, difficulty in enumerate(difficulties):
+            order[cursor[difficulty]] = i
+            cursor[difficulty] += 1
+        if sys.byteorder != 'little':
+            bounds.byteswap()
+            order.byteswap()
+        bounds.tofile(pack)
+        order.tofile(pack)
+
+        pack.seek(0)
+        pack.write(HEADER.pack(MAGIC, VERSION, len(difficulties), index_offset, difficulty_offset, order_offset))
+    os.replace(tmp_path, pack_path)
+    return len(difficulties)
+
+
+class QuestionPack(Sequence):
+    """Read-only, memory-mapped view of a compiled pack.
+
+    Questions are decoded on access, so opening a pack costs the same for a
+    hundred questions as for millions.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as pack:
+            self._mmap = mmap.mmap(pack.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self._count, self._index_offset,
+         self._difficulty_offset, self._order_offset) = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a version {VERSION} question pack")
+
+    def __len__(self):
+        return self._count
+
+    def _record(self, i):
+        start, end = struct.unpack_from("<QQ", self._mmap, self._index_offset + i * 8)
+        return self._mmap[start:end].decode('utf-8')
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("question index out of range")
+        fields = self._record(i).split(FIELD_SEPARATOR)
+        return {
+            'question': fields[0],
+            'options': fields[1:5],
+            'correct': fields[5],
+            'difficulty': self._mmap[self._difficulty_offset + i]
+        }
+
+    def difficulties(self):
+        """Every question's difficulty as bytes, without decoding any records."""
+        start = self._difficulty_offset
+        return self._mmap[start:start + self._count]
+
+    def by_difficulty(self):
+        """(bounds, order): question indices grouped by difficulty, straight from the mapping.
+
+        order is a memoryview of little-endian u32s; the questions of
+        difficulty d are entries bounds[d] to bounds[d + 1].
+        """
+        start = self._order_offset
+        bounds = struct.unpack_from(f"<{MAX_DIFFICULTY + 2}Q", self._mmap, start)
+        start += 8 * len(bounds)
+        return bounds, memoryview(self._mmap)[start:start + 4 * self._count]
+
+    def close(self):
+        self._mmap.close()
+
+
+def pack_is_current(source_path, pack_path):
+    """True if the pack exists and is at least as new as its source."""
+    if not os.path.exists(pack_path):
+        return False
+    if not os.path.exists(source_path):
+        return True
+    return os.path.getmtime(pack_path) >= os.path.getmtime(source_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile a pipe-delimited question file into a pack.")
+    parser.add_argument("source", help="pipe-delimited question file, e.g. questions.txt")
+    parser.add_argument("pack", help="output pack path, e.g. questions.kbcq")
+    args = parser.parse_args()
+
+    count = compile_pack(args.source, args.pack)
+    print(f"Compiled {count} questions into {args.pack}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""Difficulty-tiered question sampling without repeats across recent sessions.
+
+Questions are grouped into tiers by the prize rung they are rated for. The
+grouping is a TierIndex: question indices ordered by difficulty, read
+straight from a compiled pack's mapping (or sorted once for a text bank),
+with each tier a few ranges of it. It never changes, so any number of
+samplers can share one.
+
+Each sampler walks every tier in its own random order with a cursor, so a
+draw is O(1) regardless of bank size. The order is a Fisher-Yates shuffle
+done lazily, one swap per draw, with the swapped entries kept in a dict, so
+a sampler only holds the few entries it has drawn rather than a shuffled
+copy of the tier.
+
+Questions asked in the last `history` sessions are skipped while any fresh
+question is left in the tier.
+"""
+import random
+from collections import Counter, deque
+
+import numpy as np
+
+# Default tiers: easy, medium and hard bands of five prize rungs each
+DEFAULT_BANDS = [(1, 5), (6, 10), (11, 15)]
+DEFAULT_HISTORY = 5
+
+# Highest difficulty value a question can carry
+MAX_DIFFICULTY = 255
+
+
+class TierIndex:
+    """Question indices grouped into difficulty tiers, shared by samplers.
+
+    `order` lists question indices sorted by difficulty and `bounds[d]` is
+    where difficulty d starts in it. Tier t covers bands[t]; one extra tier
+    at the end holds the unrated pool (0 and any rung outside every band).
+    """
+    def __init__(self, order, bounds, bands=DEFAULT_BANDS):
+        self.order = order
+        self.count = len(order)
+        self.bands = list(bands)
+        self.rung_tier = {}
+        tier_of_difficulty = [len(self.bands)] * (len(bounds) - 1)
+        for tier, (low, high) in enumerate(self.bands):
+            for rung in range(low, high + 1):
+                self.rung_tier[rung] = tier
+                if rung < len(tier_of_difficulty):
+                    tier_of_difficulty[rung] = tier
+
+        # Each tier is a list of (start, end) ranges of order
+        self.ranges = [[] for _ in range(len(self.bands) + 1)]
+        for difficulty, tier in enumerate(tier_of_difficulty):
+            start, end = int(bounds[difficulty]), int(bounds[difficulty + 1])
+            if end > start:
+                self.ranges[tier].append((start, end))
+
+    @classmethod
+    def for_questions(cls, questions, bands=DEFAULT_BANDS):
+        """Index for a QuestionPack, read from its mapping, or for a list of question dicts."""
+        if hasattr(questions, 'by_difficulty'):
+            bounds, order = questions.by_difficulty()
+            return cls(np.frombuffer(order, dtype='<u4'), bounds, bands)
+        return cls.from_difficulties([q['difficulty'] for q in questions], bands)
+
+    @classmethod
+    def from_difficulties(cls, difficulties, bands=DEFAULT_BANDS):
+        """Index built by sorting one difficulty per question (prize rung 1-15, 0 if unrated)."""
+        difficulties = np.frombuffer(bytes(difficulties), dtype=np.uint8) \
+            if isinstance(difficulties, (bytes, bytearray, memoryview)) \
+            else np.asarray(difficulties, dtype=np.uint8)
+        order = np.argsort(difficulties, kind='stable').astype(np.uint32)
+        bounds = np.searchsorted(difficulties[order], np.arange(MAX_DIFFICULTY + 2))
+        return cls(order, bounds, bands)
+
+    def tier_size(self, tier):
+        return sum(end - start for start, end in self.ranges[tier])
+
+    def question(self, tier, position):
+        """Question index at a position within a tier."""
+        for start, end in self.ranges[tier]:
+            if position < end - start:
+                return int(self.order[start + position])
+            position -= end - start
+        raise IndexError("position outside the tier")
+
+
+class _Tier:
+    """One sampler's random walk through a shared tier."""
+    def __init__(self, index, tier, rng):
+        self.index = index
+        self.tier = tier
+        self.size = index.tier_size(tier)
+        self.rng = rng
+        self.cursor = 0
+        # Positions moved by the lazy shuffle: position -> position whose question is there now
+        self.swaps = {}
+
+    def __len__(self):
+        return self.size
+
+    def next(self):
+        if self.cursor >= self.size:
+            # Pass complete; start a fresh shuffle
+            self.cursor = 0
+            self.swaps.clear()
+        swaps = self.swaps
+        cursor = self.cursor
+        pick = cursor + int(self.rng.integers(self.size - cursor))
+        chosen = swaps.get(pick, pick)
+        swaps[pick] = swaps.pop(cursor, cursor)
+        self.cursor += 1
+        return self.index.question(self.tier, chosen)
+
+
+class QuestionSampler:
+    """Draw one question per prize rung from the matching difficulty tier.
+
+    `questions` is a TierIndex, shared with other samplers, or one
+    difficulty per question: the prize rung (1-15) it is rated for, or 0 if
+    unrated. Unrated questions form a shared pool that is used whenever a
+    tier has nothing fresh to offer; after that the nearest other tiers are
+    tried.
+    """
+    def __init__(self, questions, bands=DEFAULT_BANDS, history=DEFAULT_HISTORY, rng=None):
+        self.rng = rng or np.random.default_rng(random.getrandbits(64))
+        index = questions if isinstance(questions, TierIndex) else TierIndex.from_difficulties(questions, bands)
+        self.index = index
+        self.count = index.count
+        self.bands = index.bands
+        self.rung_tier = index.rung_tier
+        self.tiers = [_Tier(index, t, self.rng) for t in range(len(self.bands) + 1)]
+
+        # How many of the last `history` sessions asked each question
+        self.history = history
+        self.seen = Counter()
+        self.recent = deque()
+
+    def _draw_from(self, tier, session, allow_seen):
+        """Next usable question in a tier, or None if nothing in it will do.
+
+        The rest of the current pass and then one whole new pass are tried, so
+        every question in the tier is seen once even if the pass wraps.
+        """
+        for _ in range(2 * len(tier) - tier.cursor):
+            index = tier.next()
+            if index in session:
+                continue
+            if allow_seen or index not in self.seen:
+                return index
+        return None
+
+    def _tier_order(self, rung):
+        """Tiers to try for a rung: its own, the unrated pool, then nearest others."""
+        unrated = len(self.bands)
+        own = self.rung_tier.get(rung, unrated)
+        others = sorted((t for t in range(len(self.bands)) if t != own),
+                        key=lambda t: abs(t - own))
+        order = [own] + ([unrated] if own != unrated else []) + others
+        return [self.tiers[t] for t in order if len(self.tiers[t])]
+
+    def draw(self, rung, session):
+        """Pick a question index for a rung that is not already in `session`."""
+        tiers = self._tier_order(rung)
+        for allow_seen in (False, True):
+            for tier in tiers:
+                index = self._draw_from(tier, session, allow_seen)
+                if index is not None:
+                    return index
+        raise ValueError("Not enough questions to fill a session")
+
+    def sample_session(self, rungs=15):
+        """Question indices for one game, one per rung from easiest to hardest."""
+        if rungs > self.count:
+            raise ValueError("Not enough questions to fill a session")
+        session = {}
+        for rung in range(1, rungs + 1):
+            session[self.draw(rung, session)] = rung
+        picked = list(session)
+
+        # Remember this session and forget the one that fell out of the window
+        self.seen.update(picked)
+        self.recent.append(picked)
+        if len(self.recent) > self.history:
+            self.seen.subtract(self.recent.popleft())
+            self.seen += Counter()  # Drop questions no longer in any recent session
+        return picked
@@ -0,0 +1,104 @@
+"""Word-wrapping and fitting text with cached word measurements.
+
+Fonts are only asked for the width of each distinct word once; lines are
+then built by adding up cached widths, so wrapping is linear in the number
+of words. Works with any font object that has size() and get_linesize(),
+such as pygame.font.Font.
+"""
+
+# Distinct words remembered per font before the cache starts over
+MAX_WORDS_PER_FONT = 50000
+
+
+class WordWidths:
+    """Per-font cache of rendered word widths."""
+    def __init__(self, max_words=MAX_WORDS_PER_FONT):
+        self.max_words = max_words
+        self.fonts = {}
+        self.hits = 0
+        self.misses = 0
+
+    def width(self, font, word):
+        widths = self.fonts.get(font)
+        if widths is None:
+            widths = self.fonts[font] = {}
+        width = widths.get(word)
+        if width is None:
+            self.misses += 1
+            if len(widths) >= self.max_words:
+                widths.clear()
+            width = widths[word] = font.size(word)[0]
+        else:
+            self.hits += 1
+        return width
+
+    def text_width(self, font, text):
+        """Width of a single line of text, from its words and spaces."""
+        words = text.split(' ')
+        space = self.width(font, ' ')
+        return sum(self.width(font, word) for word in words) + space * (len(words) - 1)
+
+
+# Shared by all layouts
+WORD_WIDTHS = WordWidths()
+
+
+class TextLayout:
+    """Text broken into lines for a font and maximum width."""
+    def __init__(self, text, font, max_width, lines, line_widths):
+        self.text = text
+        self.font = font
+        self.max_width = max_width
+        self.lines = lines
+        self.line_widths = line_widths
+        self.line_height = font.get_linesize()
+        self.width = max(line_widths) if line_widths else 0
+        self.height = self.line_height * len(lines)
+
+    def line_centers(self, center_x, first_center_y):
+        """(line, (x, y)) pairs centring each line under the one before."""
+        return [(line, (center_x, first_center_y + i * self.line_height))
+                for i, line in enumerate(self.lines)]
+
+
+def layout_text(text, font, max_width, widths=WORD_WIDTHS):
+    """Wrap text greedily at spaces so each line fits max_width.
+
+    A single word wider than max_width is kept whole on its own line.
+    """
+    words = text.split(' ')
+    space = widths.width(font, ' ')
+    lines = []
+    line_widths = []
+    current = [words[0]]
+    current_width = widths.width(font, words[0])
+
+    for word in words[1:]:
+        word_width = widths.width(font, word)
+        if current_width + space + word_width <= max_width:
+            current.append(word)
+            current_width += space + word_width
+        else:
+            lines.append(' '.join(current))
+            line_widths.append(current_width)
+            current = [word]
+            current_width = word_width
+
+    lines.append(' '.join(current))
+    line_widths.append(current_width)
+    return TextLayout(text, font, max_width, lines, line_widths)
+
+
+def fit_layout(text, fonts, max_width, max_height, max_lines=2, widths=WORD_WIDTHS):
+    """Largest layout of text that fits the box, preferring fewer lines.
+
+    Tries every font (largest first) on a single line, then allows wrapping
+    onto up to max_lines. Falls back to the smallest font wrapped to width.
+    """
+    for lines_allowed in range(1, max_lines + 1):
+        for font in fonts:
+            layout = layout_text(text, font, max_width, widths)
+            if (len(layout.lines) <= lines_allowed and layout.width <= max_width
+                    and layout.height <= max_height):
+                return layout
+    return layout_text(text, fonts[-1], max_width, widths)